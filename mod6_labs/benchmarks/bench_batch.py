@@ -0,0 +1,71 @@
+"""Benchmark: wall-clock scaling of get_weather_many / get_forecast_many.
+
+Each batch size runs against the local mock server with empty caches, so
+every city is an upstream request::
+
+    python benchmarks/bench_batch.py --latency 0.05 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+
+from mock_server import MockServer  # noqa: E402
+from locations import LocationResolver  # noqa: E402
+from rate_limiter import TokenBucket  # noqa: E402
+from weather_service import WeatherCache, WeatherService  # noqa: E402
+
+BATCH_SIZES = (1, 10, 25, 50, 100, 200)
+
+
+async def bench_batch(server: MockServer, cities, concurrency: int, forecast: bool):
+    """Run one batch with fresh caches; return (seconds, results, errors)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        async with WeatherService(
+            server.weather_url, server.forecast_url, rate_limiter=TokenBucket(0)
+        ) as service:
+            service.cache = WeatherCache(Path(tmp) / "weather")
+            service.forecast_cache = WeatherCache(Path(tmp) / "forecast")
+            service.locations = LocationResolver(Path(tmp) / "locations.json")
+            fetch = service.get_forecast_many if forecast else service.get_weather_many
+            start = time.perf_counter()
+            results, errors = await fetch(cities, concurrency=concurrency)
+            elapsed = time.perf_counter() - start
+            # Second pass: every known city is served from cache
+            start = time.perf_counter()
+            await fetch(cities, concurrency=concurrency)
+            cached = time.perf_counter() - start
+    return elapsed, cached, results, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="mock server latency (s)")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--forecast", action="store_true", help="benchmark get_forecast_many")
+    args = parser.parse_args()
+
+    with MockServer(latency=args.latency) as server:
+        print(f"latency {args.latency * 1000:.0f} ms, concurrency {args.concurrency}\n")
+        print(f"{'cities':>7}{'wall (s)':>10}{'sequential (s)':>16}{'speedup':>9}"
+              f"{'repeat (ms)':>13}{'errors':>8}")
+        for size in BATCH_SIZES:
+            # One unknown city per batch shows failures do not abort the rest
+            cities = [f"City {i}" for i in range(size - 1)] + ["Unknown City"]
+            server.reset_counters()
+            elapsed, cached, results, errors = asyncio.run(
+                bench_batch(server, cities, args.concurrency, args.forecast)
+            )
+            sequential = size * args.latency
+            print(f"{size:>7}{elapsed:>10.2f}{sequential:>16.2f}{sequential / elapsed:>9.1f}"
+                  f"{cached * 1000:>13.1f}{len(errors):>8}")
+
+
+if __name__ == "__main__":
+    main()
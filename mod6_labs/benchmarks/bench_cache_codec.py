@@ -0,0 +1,82 @@
+"""Benchmark: cache file encode/decode time and size per serializer.
+
+Compares the original format (the raw API response as JSON text) with every
+installed ``cache_serializers`` serializer encoding the compact model rows::
+
+    python benchmarks/bench_cache_codec.py --iterations 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+
+import cache_serializers  # noqa: E402
+from mock_server import forecast_payload, weather_payload  # noqa: E402
+from models import CurrentWeather, Forecast  # noqa: E402
+
+
+def _time_us(func, iterations: int) -> float:
+    """Mean microseconds per call of ``func()``."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _legacy(payload, iterations: int):
+    """The original cache file: ``{"timestamp", "data"}`` as JSON text."""
+    text = json.dumps({"timestamp": time.time(), "data": payload})
+    encode = _time_us(lambda: json.dumps({"timestamp": 0.0, "data": payload}), iterations)
+    decode = _time_us(lambda: json.loads(text), iterations)
+    return encode, decode, len(text.encode("utf-8"))
+
+
+def _serializer(serializer, row, iterations: int):
+    blob = cache_serializers.encode(serializer, time.time(), row)
+    header_size = cache_serializers.HEADER.size
+
+    def decode_blob():
+        cache_serializers.HEADER.unpack_from(blob)
+        serializer.loads(blob[header_size:])
+
+    encode = _time_us(lambda: cache_serializers.encode(serializer, 0.0, row), iterations)
+    decode = _time_us(decode_blob, iterations)
+    return encode, decode, len(blob)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    weather = weather_payload("Manila")
+    forecast = forecast_payload("Manila")
+    cases = (
+        ("current", weather, CurrentWeather.from_api(weather).to_row()),
+        ("forecast", forecast, Forecast.from_api(forecast).to_row()),
+    )
+
+    serializers = []
+    for name in cache_serializers.SERIALIZERS:
+        serializer = cache_serializers._try_create(name)
+        if serializer is None:
+            print(f"{name}: not installed, skipped")
+        else:
+            serializers.append(serializer)
+
+    print(f"\n{'payload':<10}{'format':<22}{'encode us':>11}{'decode us':>11}{'bytes':>9}")
+    for label, payload, row in cases:
+        encode, decode, size = _legacy(payload, args.iterations)
+        print(f"{label:<10}{'raw json (original)':<22}{encode:>11.1f}{decode:>11.1f}{size:>9}")
+        for serializer in serializers:
+            encode, decode, size = _serializer(serializer, row, args.iterations)
+            print(f"{label:<10}{serializer.name + ' rows':<22}{encode:>11.1f}{decode:>11.1f}{size:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: new httpx client per request vs. the shared pooled client.
+
+Runs against the local mock server, so no API key or network is needed::
+
+    python benchmarks/bench_connection_pool.py --requests 500 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+from rate_limiter import TokenBucket  # noqa: E402
+from weather_service import WeatherService  # noqa: E402
+
+
+async def _run(worker, total: int, concurrency: int) -> float:
+    """Issue ``total`` calls of ``worker(i)`` with ``concurrency`` in flight; return seconds."""
+    queue = iter(range(total))
+
+    async def drain():
+        for i in queue:
+            await worker(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(drain() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def bench_client_per_request(server: MockServer, total: int, concurrency: int) -> float:
+    """The original behaviour: open and close an AsyncClient around every call."""
+    async def worker(i):
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(
+                server.weather_url,
+                params={"q": f"city{i}", "appid": "benchmark", "units": "metric"},
+            )
+            response.json()
+
+    return await _run(worker, total, concurrency)
+
+
+async def bench_shared_client(server: MockServer, total: int, concurrency: int) -> float:
+    """The pooled client owned by WeatherService (cache bypassed)."""
+    async with WeatherService(
+        server.weather_url, server.forecast_url, rate_limiter=TokenBucket(0)
+    ) as service:
+        async def worker(i):
+            await service._request(service.base_url, f"city{i}", "metric")
+
+        return await _run(worker, total, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    with MockServer() as server:
+        print(f"{args.requests} requests, concurrency {args.concurrency}\n")
+        print(f"{'mode':<22}{'req/s':>10}{'connections':>14}")
+        for name, bench in (
+            ("client per request", bench_client_per_request),
+            ("shared pooled client", bench_shared_client),
+        ):
+            server.reset_counters()
+            elapsed = asyncio.run(bench(server, args.requests, args.concurrency))
+            print(f"{name:<22}{args.requests / elapsed:>10.0f}{server.connection_count:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Benchmark: WeatherService under load at increasing concurrency.
+
+Each level starts with empty caches and issues ``--requests`` lookups drawn
+from a skewed (Zipf-like) set of cities, so popular cities repeat the way
+real traffic does. The mock server can add latency jitter, 503s and 429s::
+
+    python benchmarks/bench_load.py --levels 1,10,50 --requests 1000 \\
+        --latency 0.05 --error-rate 0.02 --rate-limit-rate 0.01 --output load.json
+
+Per level it reports throughput, p50/p99 latency, the cache hit rate and the
+upstream calls saved by caching and request coalescing. ``--output`` saves
+the results as JSON; ``--baseline`` compares against an earlier file and
+exits with status 1 when throughput or p99 regress by more than
+``--tolerance``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+
+from mock_server import MockServer  # noqa: E402
+from locations import LocationResolver  # noqa: E402
+from metrics import MetricsRegistry  # noqa: E402
+from rate_limiter import RetryPolicy, TokenBucket  # noqa: E402
+from weather_service import WeatherCache, WeatherService  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def workload(cities: int, requests: int, seed: int) -> List[str]:
+    """``requests`` city names where the city of rank k is picked with weight 1/k."""
+    names = [f"City {i}" for i in range(cities)]
+    weights = [1 / (rank + 1) for rank in range(cities)]
+    return random.Random(seed).choices(names, weights, k=requests)
+
+
+async def run_level(server: MockServer, queries: List[str], concurrency: int, args) -> Dict[str, Any]:
+    """Drive one fresh service with ``concurrency`` workers; return its summary."""
+    metrics = MetricsRegistry()
+    latencies: List[float] = []
+    errors = 0
+    server.reset_counters()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        async with WeatherService(
+            server.weather_url,
+            server.forecast_url,
+            rate_limiter=TokenBucket(0),
+            retry_policy=RetryPolicy(base_delay=args.retry_base_delay),
+            metrics=metrics,
+        ) as service:
+            service.cache = WeatherCache(Path(tmp) / "weather", name="weather", metrics=metrics)
+            service.forecast_cache = WeatherCache(Path(tmp) / "forecast", name="forecast", metrics=metrics)
+            service.locations = LocationResolver(Path(tmp) / "locations.json")
+            fetch = service.get_forecast if args.forecast else service.get_weather
+            pending = iter(queries)
+
+            async def worker():
+                nonlocal errors
+                for city in pending:
+                    sent = time.perf_counter()
+                    try:
+                        await fetch(city)
+                    except Exception:
+                        errors += 1
+                    latencies.append(time.perf_counter() - sent)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    lookups = metrics.counter("weather_cache_lookups_total", "", ("cache", "result"))
+    # Cache and endpoint labels share the name
+    cache = "forecast" if args.forecast else "weather"
+    hits = lookups.value(cache, "hit") + lookups.value(cache, "stale")
+    total_lookups = hits + lookups.value(cache, "miss")
+    upstream = server.request_count
+    return {
+        "concurrency": concurrency,
+        "requests": len(queries),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(queries) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "cache_hit_rate": round(hits / total_lookups, 4) if total_lookups else 0.0,
+        "coalesced": int(
+            metrics.counter("weather_coalesced_requests_total", "", ("endpoint",)).value(cache)
+        ),
+        "upstream_calls": upstream,
+        "upstream_calls_saved": len(queries) - upstream,
+        "responses_by_status": {str(k): v for k, v in sorted(server.responses_by_status.items())},
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, tolerance: float) -> bool:
+    """Print changes against ``baseline_path``; return True if nothing regressed."""
+    with open(baseline_path, "r") as f:
+        baseline = {row["concurrency"]: row for row in json.load(f)["results"]}
+
+    ok = True
+    print(f"\ncompared with {baseline_path} (tolerance {tolerance:.0%})")
+    print(f"{'conc':>5}{'req/s':>16}{'p99 (ms)':>18}")
+    for row in results:
+        before = baseline.get(row["concurrency"])
+        if before is None:
+            continue
+        throughput = row["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0.0
+        p99 = row["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+        regressed = throughput < -tolerance or p99 > tolerance
+        ok = ok and not regressed
+        print(f"{row['concurrency']:>5}{throughput:>+16.1%}{p99:>+18.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", default="1,5,10,25,50,100", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=500, help="lookups per level")
+    parser.add_argument("--cities", type=int, default=50, help="distinct cities in the workload")
+    parser.add_argument("--forecast", action="store_true", help="load get_forecast instead of get_weather")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock server latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After sent with 429 (s)")
+    parser.add_argument("--retry-base-delay", type=float, default=0.05, help="client backoff base (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression (fraction)")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    queries = workload(args.cities, args.requests, args.seed)
+    results = []
+
+    print(f"{args.requests} {'forecast' if args.forecast else 'weather'} lookups over {args.cities} cities, "
+          f"latency {args.latency * 1000:.0f}±{args.jitter * 1000:.0f} ms, "
+          f"503 rate {args.error_rate:.0%}, 429 rate {args.rate_limit_rate:.0%}\n")
+    print(f"{'conc':>5}{'req/s':>9}{'p50 (ms)':>10}{'p99 (ms)':>10}{'hit rate':>10}"
+          f"{'upstream':>10}{'saved':>8}{'coalesced':>11}{'errors':>8}")
+    for concurrency in levels:
+        with MockServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=args.retry_after,
+            seed=args.seed,
+        ) as server:
+            row = asyncio.run(run_level(server, queries, concurrency, args))
+        results.append(row)
+        print(f"{row['concurrency']:>5}{row['throughput_rps']:>9.0f}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.1f}"
+              f"{row['cache_hit_rate']:>10.1%}{row['upstream_calls']:>10}{row['upstream_calls_saved']:>8}"
+              f"{row['coalesced']:>11}{row['errors']:>8}")
+
+    if args.output:
+        report = {
+            "version": RESULTS_VERSION,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "config": {
+                key: str(value) if isinstance(value, Path) else value
+                for key, value in vars(args).items()
+                if key not in ("output", "baseline", "tolerance")
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nresults written to {args.output}")
+
+    if args.baseline and not compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark: bytes sent to the Flet client and time per weather/forecast refresh.
+
+Drives ``WeatherApp.display_weather`` and ``display_forecast`` on a real
+``ft.Page`` whose connection serializes every command batch exactly like
+the Flet socket server does, but counts the bytes instead of sending them::
+
+    python benchmarks/bench_render.py --refreshes 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENWEATHER_API_KEY", "benchmark")
+os.environ.setdefault("PREFETCH_ENABLED", "false")
+
+import flet as ft  # noqa: E402
+from flet.core.local_connection import LocalConnection  # noqa: E402
+from flet.core.protocol import (  # noqa: E402
+    ClientActions,
+    ClientMessage,
+    Command,
+    CommandEncoder,
+    PageCommandsBatchResponsePayload,
+)
+
+from mock_server import forecast_payload, weather_payload  # noqa: E402
+from models import CurrentWeather, Forecast  # noqa: E402
+
+
+class RecordingConnection(LocalConnection):
+    """Flet connection that measures outgoing messages instead of sending them."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent_bytes = 0
+        self.sent_messages = 0
+
+    def _record(self, message: ClientMessage):
+        self.sent_bytes += len(json.dumps(message, cls=CommandEncoder, separators=(",", ":")))
+        self.sent_messages += 1
+
+    def send_command(self, session_id: str, command: Command):
+        result, message = self._process_command(command)
+        if message:
+            self._record(message)
+        return PageCommandsBatchResponsePayload(results=[result] if result else [], error="")
+
+    def send_commands(self, session_id: str, commands: List[Command]):
+        results = []
+        messages = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            self._record(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages))
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refreshes", type=int, default=200)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    import main as weather_app
+
+    loop = asyncio.new_event_loop()
+    conn = RecordingConnection()
+    page = ft.Page(conn, "benchmark", loop)
+    app = weather_app.WeatherApp(page)
+
+    cities = ["Manila", "Tokyo", "London", "Cebu"]
+    payloads = [
+        (CurrentWeather.from_api(weather_payload(c)), Forecast.from_api(forecast_payload(c)))
+        for c in cities
+    ]
+
+    # First render builds the controls; it is not part of the steady state
+    app.display_weather(payloads[0][0])
+    app.display_forecast(payloads[0][1])
+
+    scenarios = (
+        # Refresh button / cache hit: the same data is rendered again
+        ("same-city refresh", lambda i: (payloads[0], "metric")),
+        # Celsius/Fahrenheit toggle on the same city
+        ("unit toggle", lambda i: (payloads[0], "imperial" if i % 2 == 0 else "metric")),
+        # A different city every time: every value changes
+        ("city switch", lambda i: (payloads[(i + 1) % len(payloads)], "metric")),
+    )
+
+    print(f"{args.refreshes} refreshes per scenario\n")
+    print(f"{'scenario':<20}{'bytes/refresh':>15}{'median ms':>11}{'p99 ms':>9}")
+    for name, pick in scenarios:
+        sizes, timings = [], []
+        for i in range(args.refreshes):
+            (weather, forecast), units = pick(i)
+            app.current_unit = units
+            before = conn.sent_bytes
+            start = time.perf_counter()
+            app.display_weather(weather)
+            app.display_forecast(forecast)
+            timings.append((time.perf_counter() - start) * 1000)
+            sizes.append(conn.sent_bytes - before)
+        timings.sort()
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        print(f"{name:<20}{statistics.mean(sizes):>15.0f}{statistics.median(timings):>11.2f}{p99:>9.2f}")
+        app.current_unit = "metric"
+        app.display_weather(payloads[0][0])
+        app.display_forecast(payloads[0][1])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: cold start time from import to the first page update.
+
+Each run starts a fresh interpreter in an empty working directory, imports
+the app and calls ``main()`` with a minimal stand-in for ``ft.Page`` that
+records when the first frame would be sent. It also reports whether any
+settings or cache/history files were touched before that frame::
+
+    python benchmarks/bench_startup.py --runs 10 --max-ms 1500
+
+With ``--max-ms`` the script exits with status 1 when the median exceeds
+the budget, so it can guard against startup regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import json, sys, time
+from concurrent.futures import Future
+from pathlib import Path
+
+started = time.perf_counter()
+sys.path.insert(0, APP_DIR)
+import config
+import main as weather_app
+imported = time.perf_counter()
+
+
+class StartupPage:
+    '''Records the first add()/update() instead of talking to a Flet client.'''
+
+    def __init__(self):
+        self.first_frame = None
+        self.disk_before_frame = None
+        self.settings_before_frame = None
+
+    def _frame(self):
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter()
+            self.settings_before_frame = config.settings.loaded
+            self.disk_before_frame = Path("cache").exists() or Path("search_history.json").exists()
+
+    def add(self, *controls):
+        self._frame()
+
+    def update(self, *controls):
+        self._frame()
+
+    def run_task(self, handler, *args, **kwargs):
+        # Background work is not started; only the path to the first frame is measured
+        return Future()
+
+
+page = StartupPage()
+weather_app.main(page)
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_frame_ms": (page.first_frame - started) * 1000,
+    "settings_before_frame": page.settings_before_frame,
+    "disk_before_frame": page.disk_before_frame,
+}))
+"""
+
+
+def run_once() -> dict:
+    with tempfile.TemporaryDirectory() as cwd:
+        env = dict(os.environ, OPENWEATHER_API_KEY=os.environ.get("OPENWEATHER_API_KEY", "benchmark"))
+        output = subprocess.run(
+            [sys.executable, "-c", f"APP_DIR = {str(APP_DIR)!r}\n" + CHILD],
+            cwd=cwd,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the median first frame is slower")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    frame_ms = statistics.median(r["first_frame_ms"] for r in results)
+    settings_touched = any(r["settings_before_frame"] for r in results)
+    disk_touched = any(r["disk_before_frame"] for r in results)
+
+    print(f"runs:                          {args.runs}")
+    print(f"median import time:            {import_ms:.1f} ms")
+    print(f"median import to first frame:  {frame_ms:.1f} ms")
+    print(f"settings read before frame:    {'yes' if settings_touched else 'no'}")
+    print(f"cache/history disk work:       {'yes' if disk_touched else 'no'}")
+
+    if args.max_ms is not None and frame_ms > args.max_ms:
+        print(f"FAIL: first frame took {frame_ms:.1f} ms (budget {args.max_ms:.1f} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
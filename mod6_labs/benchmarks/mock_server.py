@@ -0,0 +1,329 @@
+"""Local stand-in for the OpenWeatherMap API used by the benchmarks.
+
+Serves ``/data/2.5/weather`` and ``/data/2.5/forecast`` over plain HTTP/1.1
+with keep-alive, so benchmarks can drive ``WeatherService`` without a real
+API key or network access. City names starting with "unknown" get a 404.
+
+Latency (with optional jitter) and fault injection are configurable: a
+fraction of requests can be answered with 503 errors or with 429 responses
+carrying a ``Retry-After`` header. Injected faults come from a seeded RNG,
+so a run with the same settings and request order is repeatable.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+WEATHER_PATH = "/data/2.5/weather"
+FORECAST_PATH = "/data/2.5/forecast"
+
+CONDITIONS = [
+    (800, "Clear", "clear sky", "01d"),
+    (801, "Clouds", "few clouds", "02d"),
+    (803, "Clouds", "broken clouds", "04d"),
+    (500, "Rain", "light rain", "10d"),
+    (211, "Thunderstorm", "thunderstorm", "11d"),
+    (701, "Mist", "mist", "50d"),
+]
+
+
+def _city_name(city: str) -> str:
+    """City part of a query like "Manila, PH"."""
+    return city.split(",")[0].strip()
+
+
+def _seed(city: str) -> int:
+    """Stable per-city seed so repeated lookups return identical payloads."""
+    return zlib.crc32(_city_name(city).lower().encode("utf-8"))
+
+
+def city_id(city: str) -> int:
+    """The ``id`` the mock reports for ``city``."""
+    return _seed(city) % 10_000_000
+
+
+def _convert(temp_c: float, speed_ms: float, units: str):
+    if units == "imperial":
+        return temp_c * 9 / 5 + 32, speed_ms * 2.23694
+    if units == "standard":
+        return temp_c + 273.15, speed_ms
+    return temp_c, speed_ms
+
+
+def weather_payload(city: str, units: str = "metric") -> Dict[str, Any]:
+    """Build a current-weather response shaped like OpenWeatherMap's."""
+    seed = _seed(city)
+    temp_c = 5 + seed % 30
+    temp, speed = _convert(temp_c, 1 + seed % 9, units)
+    feels_like, _ = _convert(temp_c - 1.5, 0, units)
+    temp_min, _ = _convert(temp_c - 2, 0, units)
+    temp_max, _ = _convert(temp_c + 2, 0, units)
+    cond_id, main, description, icon = CONDITIONS[seed % len(CONDITIONS)]
+    now = int(time.time())
+    return {
+        "coord": {"lon": (seed % 360) - 180.0, "lat": (seed % 180) - 90.0},
+        "weather": [{"id": cond_id, "main": main, "description": description, "icon": icon}],
+        "base": "stations",
+        "main": {
+            "temp": round(temp, 2),
+            "feels_like": round(feels_like, 2),
+            "temp_min": round(temp_min, 2),
+            "temp_max": round(temp_max, 2),
+            "pressure": 1000 + seed % 30,
+            "humidity": 40 + seed % 55,
+        },
+        "visibility": 10000,
+        "wind": {"speed": round(speed, 2), "deg": seed % 360},
+        "clouds": {"all": seed % 100},
+        "dt": now,
+        "sys": {"country": "PH", "sunrise": now - 21600, "sunset": now + 21600},
+        "timezone": 28800,
+        "id": city_id(city),
+        "name": _city_name(city).title(),
+        "cod": 200,
+    }
+
+
+def forecast_payload(city: str, units: str = "metric") -> Dict[str, Any]:
+    """Build a 5-day / 3-hour forecast response shaped like OpenWeatherMap's."""
+    seed = _seed(city)
+    start = (int(time.time()) // 10800 + 1) * 10800
+    items = []
+    for i in range(40):
+        dt = start + i * 10800
+        temp_c = 5 + seed % 30 + (i % 8) - 4
+        temp, speed = _convert(temp_c, 1 + (seed + i) % 9, units)
+        temp_min, _ = _convert(temp_c - 1, 0, units)
+        temp_max, _ = _convert(temp_c + 1, 0, units)
+        cond_id, main, description, icon = CONDITIONS[(seed + i // 3) % len(CONDITIONS)]
+        items.append({
+            "dt": dt,
+            "main": {
+                "temp": round(temp, 2),
+                "feels_like": round(temp - 1, 2),
+                "temp_min": round(temp_min, 2),
+                "temp_max": round(temp_max, 2),
+                "pressure": 1000 + seed % 30,
+                "humidity": 40 + (seed + i) % 55,
+            },
+            "weather": [{"id": cond_id, "main": main, "description": description, "icon": icon}],
+            "clouds": {"all": (seed + i) % 100},
+            "wind": {"speed": round(speed, 2), "deg": (seed + i * 7) % 360},
+            "visibility": 10000,
+            "pop": 0,
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(dt)),
+        })
+    return {
+        "cod": "200",
+        "message": 0,
+        "cnt": len(items),
+        "list": items,
+        "city": {
+            "id": city_id(city),
+            "name": _city_name(city).title(),
+            "coord": {"lon": (seed % 360) - 180.0, "lat": (seed % 180) - 90.0},
+            "country": "PH",
+            "timezone": 28800,
+        },
+    }
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 makes bursts of new connections wait for SYN retries
+    request_queue_size = 256
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.mock.record_connection()
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        city = query.get("q", [""])[0]
+        if "id" in query:
+            # Lookups by id only work for cities already served by name
+            city = mock.city_names.get(query["id"][0], "unknown")
+        units = query.get("units", ["standard"])[0]
+        mock.record_request(url.path)
+
+        delay, fault = mock.next_response()
+        if delay:
+            time.sleep(delay)
+
+        headers = {}
+        if fault == 429:
+            status, body = 429, {"cod": 429, "message": "rate limit exceeded"}
+            headers["Retry-After"] = f"{mock.retry_after:g}"
+        elif fault == 503:
+            status, body = 503, {"cod": 503, "message": "service unavailable"}
+        elif city.strip().lower().startswith("unknown"):
+            status, body = 404, {"cod": "404", "message": "city not found"}
+        elif url.path == WEATHER_PATH:
+            status, body = 200, weather_payload(city, units)
+            mock.city_names[str(body["id"])] = city
+        elif url.path == FORECAST_PATH:
+            status, body = 200, forecast_payload(city, units)
+            mock.city_names[str(body["city"]["id"])] = city
+        else:
+            status, body = 404, {"cod": "404", "message": "city not found"}
+
+        mock.record_status(status)
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer:
+    """Threaded mock OpenWeatherMap server running in the background.
+
+    Use as a context manager::
+
+        with MockServer(latency=0.02) as server:
+            service = WeatherService(server.weather_url, server.forecast_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            latency: Seconds added to every response
+            jitter: Extra latency drawn uniformly from ``[0, jitter]`` seconds
+            error_rate: Fraction of requests answered with a 503
+            rate_limit_rate: Fraction of requests answered with a 429
+            retry_after: ``Retry-After`` seconds sent with each 429
+            seed: Seed for the jitter and fault RNG
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.connection_count = 0
+        self.requests_by_path: Dict[str, int] = {}
+        self.responses_by_status: Dict[int, int] = {}
+        # id -> city name, for requests that query by id
+        self.city_names: Dict[str, str] = {}
+        self._httpd = _MockHTTPServer((host, port), _MockHandler)
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def weather_url(self) -> str:
+        return self.base_url + WEATHER_PATH
+
+    @property
+    def forecast_url(self) -> str:
+        return self.base_url + FORECAST_PATH
+
+    def record_request(self, path: str):
+        with self._lock:
+            self.request_count += 1
+            self.requests_by_path[path] = self.requests_by_path.get(path, 0) + 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connection_count += 1
+
+    def record_status(self, status: int):
+        with self._lock:
+            self.responses_by_status[status] = self.responses_by_status.get(status, 0) + 1
+
+    def next_response(self) -> Tuple[float, Optional[int]]:
+        """Latency for the next response and the fault to inject (429, 503 or None)."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            return delay, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 503
+        return delay, None
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.connection_count = 0
+            self.requests_by_path = {}
+            self.responses_by_status = {}
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the mock OpenWeatherMap API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="added latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with 429 (s)")
+    args = parser.parse_args()
+
+    with MockServer(
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+    ) as server:
+        print(f"Mock OpenWeatherMap API listening on {server.base_url}")
+        print(f"  OPENWEATHER_BASE_URL={server.weather_url}")
+        print(f"  FORECAST_BASE_URL={server.forecast_url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,165 @@
+"""Pluggable serializers for ``WeatherCache`` files.
+
+Every cache file starts with a fixed binary header: a magic string, the file
+format version, the payload format id and the entry's timestamp. The payload
+after it is the cached data encoded by one of the serializers below. Readers
+pick the decoder from the header, so files written with a different
+serializer stay readable.
+
+``orjson`` and ``msgpack`` are optional; when they are not installed the
+standard library ``json`` module is used instead.
+"""
+import json
+import struct
+from typing import Any, Dict, Optional, Tuple, Type
+
+MAGIC = b"WXC"
+FORMAT_VERSION = 1
+# magic, file format version, payload format id, timestamp
+HEADER = struct.Struct("<3sBBd")
+
+JSON_FORMAT = 1
+MSGPACK_FORMAT = 2
+
+
+class Serializer:
+    """Encodes cache data to bytes and back."""
+
+    name = ""
+    format_id = 0
+
+    def dumps(self, data: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, payload: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    """Compact JSON via the standard library."""
+
+    name = "json"
+    format_id = JSON_FORMAT
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, payload: bytes) -> Any:
+        return json.loads(payload)
+
+
+class OrjsonSerializer(Serializer):
+    """JSON via ``orjson``; writes the same format as ``JsonSerializer``."""
+
+    name = "orjson"
+    format_id = JSON_FORMAT
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, data: Any) -> bytes:
+        return self._orjson.dumps(data)
+
+    def loads(self, payload: bytes) -> Any:
+        return self._orjson.loads(payload)
+
+
+class MsgpackSerializer(Serializer):
+    """Binary MessagePack via ``msgpack``."""
+
+    name = "msgpack"
+    format_id = MSGPACK_FORMAT
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def dumps(self, data: Any) -> bytes:
+        return self._msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, payload: bytes) -> Any:
+        return self._msgpack.unpackb(payload, raw=False)
+
+
+SERIALIZERS: Dict[str, Type[Serializer]] = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+# Preference order for "auto"
+AUTO_ORDER = ("msgpack", "orjson", "json")
+
+
+def _try_create(name: str) -> Optional[Serializer]:
+    try:
+        return SERIALIZERS[name]()
+    except ImportError:
+        return None
+
+
+def get_serializer(name: str = "auto") -> Serializer:
+    """
+    Create a serializer by name.
+
+    Args:
+        name: 'json', 'orjson', 'msgpack', or 'auto' for the fastest installed one
+
+    Returns:
+        The requested serializer, or ``JsonSerializer`` if its library is missing
+    """
+    name = name.strip().lower()
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            serializer = _try_create(candidate)
+            if serializer is not None:
+                return serializer
+    if name not in SERIALIZERS:
+        print(f"Unknown cache serializer '{name}', using json")
+        return JsonSerializer()
+    return _try_create(name) or JsonSerializer()
+
+
+_decoders: Dict[int, Serializer] = {}
+
+
+def _decoder(format_id: int) -> Optional[Serializer]:
+    """Fastest installed serializer that can read ``format_id`` payloads."""
+    if format_id not in _decoders:
+        for name in AUTO_ORDER:
+            serializer = _try_create(name)
+            if serializer is not None and serializer.format_id == format_id:
+                _decoders[format_id] = serializer
+                break
+        else:
+            return None
+    return _decoders[format_id]
+
+
+def encode(serializer: Serializer, timestamp: float, data: Any) -> bytes:
+    """Header plus ``data`` encoded with ``serializer``."""
+    return HEADER.pack(MAGIC, FORMAT_VERSION, serializer.format_id, timestamp) + serializer.dumps(data)
+
+
+def decode(blob: bytes) -> Tuple[float, Any]:
+    """
+    Split a cache file into ``(timestamp, data)``.
+
+    Raises:
+        ValueError: If the file is corrupt or its format cannot be read here
+    """
+    if not blob.startswith(MAGIC):
+        raise ValueError("Not a cache file")
+    if len(blob) < HEADER.size:
+        raise ValueError("Truncated cache file")
+    _, version, format_id, timestamp = HEADER.unpack_from(blob)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache file version {version}")
+    serializer = _decoder(format_id)
+    if serializer is None:
+        raise ValueError(f"No serializer installed for cache format {format_id}")
+    try:
+        return timestamp, serializer.loads(blob[HEADER.size:])
+    except Exception as e:
+        raise ValueError(f"Unreadable cache payload: {e}") from None
@@ -0,0 +1,92 @@
+"""Type-ahead suggestions for the city search box.
+
+``PrefixIndex`` keeps normalized city names in a sorted list, so the names
+starting with what the user has typed form one contiguous run found with
+``bisect``. Recently searched cities rank ahead of the bundled list.
+"""
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+CITY_LIST_FILE = Path(__file__).parent / "cities.txt"
+
+
+def normalize(text: str) -> str:
+    """Lower-case ``text`` and collapse whitespace, for comparing city names."""
+    return " ".join(text.lower().split())
+
+
+def load_city_list(path: Path = CITY_LIST_FILE) -> List[str]:
+    """Read the bundled city names, skipping blank and ``#`` comment lines."""
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError as e:
+        print(f"Error loading city list: {e}")
+        return []
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+class PrefixIndex:
+    """In-memory prefix index over city names."""
+
+    def __init__(self, cities: Iterable[str] = ()):
+        self._keys: List[str] = []
+        # normalized name -> name as displayed
+        self._names: Dict[str, str] = {}
+        # normalized name -> position in search history (0 = most recent)
+        self._recent: Dict[str, int] = {}
+        self.add(cities)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, city: str) -> bool:
+        return normalize(city) in self._names
+
+    def add(self, cities: Iterable[str]):
+        """Add city names; names already present keep their original spelling."""
+        added = False
+        for city in cities:
+            key = normalize(city)
+            if key and key not in self._names:
+                self._names[key] = city.strip()
+                added = True
+        if added:
+            self._keys = sorted(self._names)
+
+    def set_recent(self, history: Sequence[str]):
+        """Rank ``history`` (most recent first) ahead of every other match."""
+        self.add(history)
+        self._recent = {}
+        for rank, city in enumerate(history):
+            self._recent.setdefault(normalize(city), rank)
+
+    def is_recent(self, city: str) -> bool:
+        return normalize(city) in self._recent
+
+    def suggest(self, text: str, limit: int = 6) -> List[str]:
+        """
+        City names starting with ``text``.
+
+        Args:
+            text: What the user has typed so far
+            limit: Maximum number of suggestions
+
+        Returns:
+            Recent matches in history order, then other matches alphabetically
+        """
+        prefix = normalize(text)
+        if not prefix or limit <= 0:
+            return []
+
+        recent = sorted(
+            (rank, key) for key, rank in self._recent.items() if key.startswith(prefix)
+        )
+        keys = [key for _, key in recent[:limit]]
+
+        i = bisect_left(self._keys, prefix)
+        while len(keys) < limit and i < len(self._keys) and self._keys[i].startswith(prefix):
+            if self._keys[i] not in self._recent:
+                keys.append(self._keys[i])
+            i += 1
+        return [self._names[key] for key in keys]
@@ -1,38 +1,209 @@
-"""Configuration management for the weather application."""
+"""Configuration management for the weather application.
+
+Settings are resolved lazily: importing this module does no I/O. The ``.env``
+file and environment variables are read the first time any setting is
+accessed through ``settings``. Code and tests can override values with
+``settings.override(NAME=value)``, which also works as a context manager.
+"""
 import os
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Any, Dict, Optional
 
 # Get the directory where this config file is located
 BASE_DIR = Path(__file__).parent.resolve()
 ENV_FILE = BASE_DIR / ".env"
 
-# Load environment variables from .env file
-# Try loading from explicit path first, then default location
-if ENV_FILE.exists():
-    load_dotenv(dotenv_path=ENV_FILE)
-else:
-    load_dotenv()  # Fallback to default location
-
-# API Configuration
-OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "").strip()
-OPENWEATHER_BASE_URL = os.getenv(
-    "OPENWEATHER_BASE_URL", 
-    "https://api.openweathermap.org/data/2.5/weather"
-)
-FORECAST_BASE_URL = "https://api.openweathermap.org/data/2.5/forecast"
-
-# Application Configuration
-CACHE_DIR = Path("cache")
-CACHE_EXPIRY_MINUTES = 30
-HISTORY_FILE = Path("search_history.json")
-MAX_HISTORY_ITEMS = 10
-
-# Validate API key
-if not OPENWEATHER_API_KEY:
-    print("WARNING: OPENWEATHER_API_KEY not found in environment variables.")
-    print("Please create a .env file with your OpenWeatherMap API key.")
-    print("Get a free key at: https://openweathermap.org/api")
-else:
-    print(f"API key loaded successfully (length: {len(OPENWEATHER_API_KEY)})")
 
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name, default).strip()
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+def _load_settings() -> Dict[str, Any]:
+    """Read the .env file and environment into a dictionary of settings."""
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file
+    # Try loading from explicit path first, then default location
+    if ENV_FILE.exists():
+        load_dotenv(dotenv_path=ENV_FILE)
+    else:
+        load_dotenv()  # Fallback to default location
+
+    values = {
+        # API Configuration
+        "OPENWEATHER_API_KEY": _env_str("OPENWEATHER_API_KEY", ""),
+        "OPENWEATHER_BASE_URL": _env_str(
+            "OPENWEATHER_BASE_URL",
+            "https://api.openweathermap.org/data/2.5/weather"
+        ),
+        "FORECAST_BASE_URL": _env_str(
+            "FORECAST_BASE_URL",
+            "https://api.openweathermap.org/data/2.5/forecast"
+        ),
+
+        # HTTP Client Configuration
+        # One pooled client is shared by every request the app makes, so these
+        # limits apply to the whole process rather than to a single lookup.
+        "REQUEST_TIMEOUT_SECONDS": _env_float("REQUEST_TIMEOUT_SECONDS", 10),
+        "HTTP_MAX_CONNECTIONS": _env_int("HTTP_MAX_CONNECTIONS", 20),
+        "HTTP_MAX_KEEPALIVE_CONNECTIONS": _env_int("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10),
+        "HTTP_KEEPALIVE_EXPIRY_SECONDS": _env_float("HTTP_KEEPALIVE_EXPIRY_SECONDS", 30),
+        "HTTP2_ENABLED": _env_bool("HTTP2_ENABLED", False),
+        "BATCH_MAX_CONCURRENCY": _env_int("BATCH_MAX_CONCURRENCY", 10),
+
+        # Rate Limiting and Retry Configuration
+        # The free OpenWeatherMap plan allows 60 calls per minute.
+        "RATE_LIMIT_PER_MINUTE": _env_float("RATE_LIMIT_PER_MINUTE", 60),
+        "RATE_LIMIT_BURST": _env_int("RATE_LIMIT_BURST", 10),
+        "RETRY_MAX_ATTEMPTS": _env_int("RETRY_MAX_ATTEMPTS", 3),
+        "RETRY_BASE_DELAY_SECONDS": _env_float("RETRY_BASE_DELAY_SECONDS", 0.5),
+        "RETRY_MAX_DELAY_SECONDS": _env_float("RETRY_MAX_DELAY_SECONDS", 8),
+        "RETRY_BUDGET_SECONDS": _env_float("RETRY_BUDGET_SECONDS", 20),
+
+        # Application Configuration
+        "CACHE_DIR": Path("cache"),
+        "CACHE_EXPIRY_MINUTES": 30,
+        "FORECAST_CACHE_EXPIRY_MINUTES": _env_int("FORECAST_CACHE_EXPIRY_MINUTES", 60),
+        "FORECAST_CACHE_MAX_STALE_MINUTES": _env_int("FORECAST_CACHE_MAX_STALE_MINUTES", 360),
+        "CACHE_MEMORY_MAX_ENTRIES": _env_int("CACHE_MEMORY_MAX_ENTRIES", 256),
+        "CACHE_MEMORY_MAX_BYTES": _env_int("CACHE_MEMORY_MAX_BYTES", 8 * 1024 * 1024),
+        "CACHE_DISK_MAX_ENTRIES": _env_int("CACHE_DISK_MAX_ENTRIES", 1000),
+        "CACHE_DISK_MAX_BYTES": _env_int("CACHE_DISK_MAX_BYTES", 50 * 1024 * 1024),
+        "CACHE_SWEEP_INTERVAL_SECONDS": _env_int("CACHE_SWEEP_INTERVAL_SECONDS", 300),
+        # auto, json, orjson or msgpack; missing optional libraries fall back to json
+        "CACHE_SERIALIZER": _env_str("CACHE_SERIALIZER", "auto"),
+        # "files" (one file per city) or "sqlite" (one database shared by all instances)
+        "CACHE_BACKEND": _env_str("CACHE_BACKEND", "files").lower(),
+        "CACHE_DB_PATH": Path(_env_str("CACHE_DB_PATH", str(Path("cache") / "weather_cache.sqlite3"))),
+        # network, offline-first or cache-only (see WeatherService)
+        "CACHE_MODE": _env_str("CACHE_MODE", "network").lower(),
+        "OFFLINE_MAX_STALE_MINUTES": _env_int("OFFLINE_MAX_STALE_MINUTES", 7 * 24 * 60),
+        "HISTORY_FILE": Path("search_history.json"),
+        "MAX_HISTORY_ITEMS": 10,
+        # Cities kept for ranking suggestions (the dropdown shows MAX_HISTORY_ITEMS)
+        "HISTORY_MAX_ENTRIES": _env_int("HISTORY_MAX_ENTRIES", 200),
+        # Searches within this window are written to disk together
+        "HISTORY_FLUSH_DELAY_SECONDS": _env_float("HISTORY_FLUSH_DELAY_SECONDS", 1.0),
+        "LOCATIONS_FILE": Path("locations.json"),
+        "SEARCH_DEBOUNCE_MS": _env_int("SEARCH_DEBOUNCE_MS", 300),
+
+        # Instrumentation
+        # Off by default; when on, METRICS_FILE (if set) receives a dump on exit,
+        # as Prometheus text for a .prom file and JSON otherwise.
+        "METRICS_ENABLED": _env_bool("METRICS_ENABLED", False),
+        "METRICS_FILE": _env_str("METRICS_FILE", ""),
+
+        # Background Cache Warm-up
+        # Recently searched cities are refreshed shortly before their cache entries
+        # expire, so picking one from history renders without waiting on the network.
+        "PREFETCH_ENABLED": _env_bool("PREFETCH_ENABLED", True),
+        "PREFETCH_HISTORY_COUNT": _env_int("PREFETCH_HISTORY_COUNT", 5),
+        "PREFETCH_MARGIN_SECONDS": _env_float("PREFETCH_MARGIN_SECONDS", 120),
+        "PREFETCH_MIN_INTERVAL_SECONDS": _env_float("PREFETCH_MIN_INTERVAL_SECONDS", 30),
+        "PREFETCH_MAX_INTERVAL_SECONDS": _env_float("PREFETCH_MAX_INTERVAL_SECONDS", 300),
+    }
+
+    # Validate API key
+    api_key = values["OPENWEATHER_API_KEY"]
+    if not api_key:
+        print("WARNING: OPENWEATHER_API_KEY not found in environment variables.")
+        print("Please create a .env file with your OpenWeatherMap API key.")
+        print("Get a free key at: https://openweathermap.org/api")
+    else:
+        print(f"API key loaded successfully (length: {len(api_key)})")
+
+    return values
+
+
+_MISSING = object()
+
+
+class _Override:
+    """Undo handle returned by ``Settings.override``."""
+
+    def __init__(self, settings: "Settings", previous: Dict[str, Any]):
+        self._settings = settings
+        self._previous = previous
+
+    def __enter__(self) -> "Settings":
+        return self._settings
+
+    def __exit__(self, *exc_info):
+        self.restore()
+
+    def restore(self):
+        """Put back the overrides that were active before this one."""
+        overrides = self._settings._overrides
+        for name, value in self._previous.items():
+            if value is _MISSING:
+                overrides.pop(name, None)
+            else:
+                overrides[name] = value
+
+
+class Settings:
+    """Lazily resolved application settings, read as attributes (``settings.CACHE_DIR``)."""
+
+    def __init__(self):
+        self._values: Optional[Dict[str, Any]] = None
+        self._overrides: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._overrides:
+            return self._overrides[name]
+        if self._values is None:
+            self._values = _load_settings()
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Unknown setting: {name}") from None
+
+    @property
+    def loaded(self) -> bool:
+        """True once the environment has been read."""
+        return self._values is not None
+
+    def override(self, **values: Any) -> _Override:
+        """
+        Override settings in code without touching the environment.
+
+        Overrides apply immediately. The returned handle restores the previous
+        values when used as a context manager or when ``restore()`` is called::
+
+            with settings.override(CACHE_DIR=tmp_path, PREFETCH_ENABLED=False):
+                ...
+        """
+        previous = {name: self._overrides.get(name, _MISSING) for name in values}
+        self._overrides.update(values)
+        return _Override(self, previous)
+
+    def reload(self):
+        """Forget resolved values so the next access re-reads the environment."""
+        self._values = None
+
+
+settings = Settings()
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatibility: ``config.CACHE_DIR`` still works, resolved lazily
+    if name.isupper():
+        return getattr(settings, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,203 @@
+"""Vectorized post-processing of 3-hourly forecast data.
+
+A ``Forecast`` holds a list of 3-hour slots. Instead of aggregating those
+slot by slot, they are unpacked once into columnar NumPy arrays and every
+per-day aggregate is computed with batch operations. Several cities can be
+processed together in one frame.
+"""
+from datetime import date, datetime, timezone
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from models import DailySummary, Forecast
+
+SECONDS_PER_DAY = 86400
+NOON_SECONDS = 12 * 3600
+# OpenWeatherMap condition ids are all below 1000, so (group, id) pairs can be
+# packed into a single integer key.
+CONDITION_ID_SPAN = 1000
+
+
+class ForecastFrame:
+    """Columnar view of the slots of one or more forecasts."""
+
+    def __init__(
+        self,
+        dt: np.ndarray,
+        local_dt: np.ndarray,
+        city_index: np.ndarray,
+        temp: np.ndarray,
+        temp_min: np.ndarray,
+        temp_max: np.ndarray,
+        humidity: np.ndarray,
+        wind_speed: np.ndarray,
+        condition_id: np.ndarray,
+        icons: List[str],
+        descriptions: List[str],
+    ):
+        self.dt = dt
+        self.local_dt = local_dt
+        self.city_index = city_index
+        self.temp = temp
+        self.temp_min = temp_min
+        self.temp_max = temp_max
+        self.humidity = humidity
+        self.wind_speed = wind_speed
+        self.condition_id = condition_id
+        self.icons = icons
+        self.descriptions = descriptions
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    @classmethod
+    def from_forecasts(cls, forecasts: Sequence[Forecast]) -> "ForecastFrame":
+        """
+        Unpack forecasts into columns in a single pass.
+
+        Slot ``i`` of the frame belongs to ``forecasts[city_index[i]]``. Local
+        times use each forecast's ``timezone`` offset.
+        """
+        total = sum(len(forecast.slots) for forecast in forecasts)
+        dt = np.empty(total, dtype=np.int64)
+        offset = np.empty(total, dtype=np.int64)
+        city_index = np.empty(total, dtype=np.int64)
+        numbers = np.empty((5, total), dtype=np.float64)
+        condition_id = np.empty(total, dtype=np.int64)
+        icons: List[str] = []
+        descriptions: List[str] = []
+
+        i = 0
+        for index, forecast in enumerate(forecasts):
+            for slot in forecast.slots:
+                dt[i] = slot.dt
+                offset[i] = forecast.timezone
+                city_index[i] = index
+                numbers[0, i] = slot.temp
+                numbers[1, i] = slot.temp_min
+                numbers[2, i] = slot.temp_max
+                numbers[3, i] = slot.humidity
+                numbers[4, i] = slot.wind_speed
+                condition_id[i] = slot.condition_id
+                icons.append(slot.icon)
+                descriptions.append(slot.description)
+                i += 1
+
+        return cls(
+            dt=dt,
+            local_dt=dt + offset,
+            city_index=city_index,
+            temp=numbers[0],
+            temp_min=numbers[1],
+            temp_max=numbers[2],
+            humidity=numbers[3],
+            wind_speed=numbers[4],
+            condition_id=condition_id,
+            icons=icons,
+            descriptions=descriptions,
+        )
+
+    @classmethod
+    def from_forecast(cls, forecast: Forecast) -> "ForecastFrame":
+        """Unpack a single forecast."""
+        return cls.from_forecasts([forecast])
+
+
+def _daily_summaries(frame: ForecastFrame, days: int) -> List[List[DailySummary]]:
+    """Per-city lists of daily aggregates for ``frame``."""
+    if len(frame) == 0:
+        return []
+
+    city_count = int(frame.city_index.max()) + 1
+    local_day = frame.local_dt // SECONDS_PER_DAY
+    seconds_of_day = frame.local_dt % SECONDS_PER_DAY
+
+    # Sort slots by (city, local time) so every (city, day) group is contiguous
+    order = np.lexsort((frame.local_dt, frame.city_index))
+    city = frame.city_index[order]
+    day = local_day[order]
+    group_key = city * (day.max() + 1) + day
+    _, starts, counts = np.unique(group_key, return_index=True, return_counts=True)
+    group = np.repeat(np.arange(len(starts)), counts)
+
+    temp = frame.temp[order]
+    temp_min = np.minimum.reduceat(frame.temp_min[order], starts)
+    temp_max = np.maximum.reduceat(frame.temp_max[order], starts)
+    temp_mean = np.add.reduceat(temp, starts) / counts
+    humidity = frame.humidity[order]
+    wind_speed = frame.wind_speed[order]
+
+    # Dominant condition: most frequent condition id within each group
+    condition = frame.condition_id[order]
+    pairs, pair_counts = np.unique(group * CONDITION_ID_SPAN + condition, return_counts=True)
+    pair_group = pairs // CONDITION_ID_SPAN
+    by_frequency = np.lexsort((-pair_counts, pair_group))
+    _, first_pair = np.unique(pair_group[by_frequency], return_index=True)
+    dominant = (pairs % CONDITION_ID_SPAN)[by_frequency][first_pair]
+
+    # Representative slot: the one nearest local noon (earlier slot on a tie)
+    distance = np.abs(seconds_of_day[order] - NOON_SECONDS)
+    representative = np.lexsort((distance, group))[starts]
+    # Description and icon come from the slot nearest noon among those with
+    # the dominant condition, so the card's text and icon agree with it
+    off_condition = condition != dominant[group]
+    condition_slot = np.lexsort((distance, off_condition, group))[starts]
+
+    summaries: List[List[DailySummary]] = [[] for _ in range(city_count)]
+    for g, slot in enumerate(representative):
+        city_days = summaries[int(city[slot])]
+        if len(city_days) >= days:
+            continue
+        source = int(order[slot])
+        condition_source = int(order[condition_slot[g]])
+        city_days.append(DailySummary(
+            date=_to_date(int(day[slot])),
+            dt=int(frame.dt[source]),
+            temp=float(temp[slot]),
+            temp_min=float(temp_min[g]),
+            temp_max=float(temp_max[g]),
+            temp_mean=float(temp_mean[g]),
+            humidity=int(humidity[slot]),
+            wind_speed=float(wind_speed[slot]),
+            condition_id=int(dominant[g]),
+            description=frame.descriptions[condition_source],
+            icon=frame.icons[condition_source],
+            slot_count=int(counts[g]),
+        ))
+    return summaries
+
+
+def _to_date(local_day: int) -> date:
+    return datetime.fromtimestamp(local_day * SECONDS_PER_DAY, tz=timezone.utc).date()
+
+
+def daily_summaries(forecast: Forecast, days: int = 5) -> List[DailySummary]:
+    """
+    Summarize a forecast into one entry per local calendar day.
+
+    Args:
+        forecast: Forecast from ``WeatherService.get_forecast``
+        days: Maximum number of days to return
+
+    Returns:
+        One ``DailySummary`` per day with the day's min/max/mean temperature,
+        dominant ``condition_id`` with the description and icon of its
+        noon-nearest slot, and the representative (noon-nearest) slot's
+        temperature, humidity and wind speed
+    """
+    result = _daily_summaries(ForecastFrame.from_forecast(forecast), days)
+    return result[0] if result else []
+
+
+def daily_summaries_many(
+    forecasts: Dict[str, Forecast], days: int = 5
+) -> Dict[str, List[DailySummary]]:
+    """Summarize forecasts for many cities at once, keyed like ``forecasts``."""
+    cities = list(forecasts)
+    frame = ForecastFrame.from_forecasts([forecasts[city] for city in cities])
+    result = _daily_summaries(frame, days)
+    summaries: Dict[str, List[DailySummary]] = {city: [] for city in cities}
+    for city, city_days in zip(cities, result):
+        summaries[city] = city_days
+    return summaries
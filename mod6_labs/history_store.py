@@ -0,0 +1,210 @@
+"""Search history kept in memory and written to disk in the background.
+
+``HistoryStore.record`` only updates memory and schedules a write. Writes are
+coalesced: a burst of searches within ``flush_delay`` seconds produces one
+write, made in a worker thread through a temporary file and ``os.replace``,
+so the UI never waits on disk and a crash never leaves a partial file.
+
+Each entry tracks how often and how recently a city was searched, so the
+store can keep more cities than the history dropdown shows and rank them
+for suggestions.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from city_search import normalize
+from config import settings
+
+FORMAT_VERSION = 1
+
+# A search loses half its ranking weight after this many days
+HALF_LIFE_DAYS = 14.0
+
+
+@dataclass
+class HistoryEntry:
+    """One searched city."""
+
+    __slots__ = ("city", "count", "last_used")
+
+    city: str
+    count: int
+    last_used: float
+
+    def score(self, now: float) -> float:
+        """Frequency weighted by recency ("frecency")."""
+        age_days = max(now - self.last_used, 0.0) / 86400
+        return self.count * math.pow(0.5, age_days / HALF_LIFE_DAYS)
+
+
+class HistoryStore:
+    """In-memory search history with coalesced, atomic background writes."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        flush_delay: Optional[float] = None,
+    ):
+        # Unset arguments fall back to settings. Nothing is read until load().
+        self.path = path if path is not None else settings.HISTORY_FILE
+        self.max_entries = max_entries if max_entries is not None else settings.HISTORY_MAX_ENTRIES
+        self.flush_delay = flush_delay if flush_delay is not None else settings.HISTORY_FLUSH_DELAY_SECONDS
+        # normalized city -> entry, least recently used first
+        self._entries: Dict[str, HistoryEntry] = {}
+        self._dirty = False
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+        self._writing: Optional["asyncio.Future[None]"] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def load(self):
+        """
+        Read the history file in a worker thread and merge it into memory.
+
+        Cities recorded before the file finished loading stay the most recent.
+        """
+        entries = await asyncio.to_thread(self._read)
+        for key, entry in entries.items():
+            current = self._entries.get(key)
+            if current is None:
+                self._entries[key] = entry
+            else:
+                current.count += entry.count
+                current.last_used = max(current.last_used, entry.last_used)
+        self._entries = dict(sorted(self._entries.items(), key=lambda item: item[1].last_used))
+        self._prune()
+
+    def _read(self) -> Dict[str, HistoryEntry]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            written = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Error loading history: {e}")
+            return {}
+
+        entries: Dict[str, HistoryEntry] = {}
+        if isinstance(data, list):
+            # Original format: city names, most recent first, last written at mtime
+            rows = [[city, 1, written - i] for i, city in enumerate(data)]
+        elif isinstance(data, dict):
+            rows = data.get("entries", [])
+        else:
+            rows = []
+        for row in rows:
+            try:
+                city, count, last_used = row
+                entry = HistoryEntry(str(city).strip(), max(int(count), 1), float(last_used))
+            except (TypeError, ValueError):
+                continue
+            key = normalize(entry.city)
+            if key and key not in entries:
+                entries[key] = entry
+        return entries
+
+    def record(self, city: str, now: Optional[float] = None):
+        """Count a search for ``city`` and schedule a write."""
+        city = city.strip()
+        key = normalize(city)
+        if not key:
+            return
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            entry = HistoryEntry(city, 0, 0.0)
+        entry.city = city
+        entry.count += 1
+        entry.last_used = now if now is not None else time.time()
+        self._entries[key] = entry
+        self._prune()
+        self._dirty = True
+        self._schedule_flush()
+
+    def _prune(self):
+        """Drop the lowest-ranked entries beyond ``max_entries``."""
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        now = time.time()
+        ranked = sorted(self._entries, key=lambda key: self._entries[key].score(now))
+        for key in ranked[:excess]:
+            del self._entries[key]
+
+    def recent(self, limit: Optional[int] = None) -> List[str]:
+        """Cities, most recently searched first."""
+        cities = [entry.city for entry in reversed(self._entries.values())]
+        return cities[:limit] if limit is not None else cities
+
+    def ranked(self, limit: Optional[int] = None, now: Optional[float] = None) -> List[str]:
+        """Cities ordered by frecency, best first."""
+        now = now if now is not None else time.time()
+        entries = sorted(self._entries.values(), key=lambda entry: entry.score(now), reverse=True)
+        cities = [entry.city for entry in entries]
+        return cities[:limit] if limit is not None else cities
+
+    def _schedule_flush(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            # No event loop (scripts, benchmarks): write immediately
+            self._dirty = False
+            try:
+                self._write(self._snapshot())
+            except OSError as e:
+                print(f"Error saving history: {e}")
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        # Searches recorded during a write are picked up by the next pass
+        while self._dirty:
+            await self._flush_now()
+
+    async def _flush_now(self):
+        self._dirty = False
+        self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, self._snapshot()))
+        await self._wait_for_write()
+
+    async def _wait_for_write(self):
+        # Shielded: cancelling the flush task must not start a second write
+        # while the worker thread is still replacing the file
+        try:
+            await asyncio.shield(self._writing)
+        except OSError as e:
+            print(f"Error saving history: {e}")
+
+    async def aclose(self):
+        """Write pending changes now instead of after the delay."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        if self._writing is not None and not self._writing.done():
+            await self._wait_for_write()
+        if self._dirty:
+            await self._flush_now()
+
+    def _snapshot(self) -> dict:
+        # Taken on the event loop thread, so the worker never sees a half-updated dict
+        return {
+            "version": FORMAT_VERSION,
+            "entries": [[e.city, e.count, e.last_used] for e in self._entries.values()],
+        }
+
+    def _write(self, snapshot: dict):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
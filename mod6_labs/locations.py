@@ -0,0 +1,161 @@
+"""Resolution of free-text city queries to OpenWeatherMap city ids.
+
+The first lookup of a spelling ("Manila", "manila ", "Manila, PH") is sent
+by name. The city ``id`` in the response is remembered for that spelling,
+and every later request for it is sent by id and cached under the id. All
+spellings of one city therefore share one cache entry, and the mapping is
+kept on disk across restarts. The file is read in a worker thread by
+``load``; new ids are written in the background, coalesced the same way as
+``HistoryStore`` writes, so resolving a city never waits on disk.
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import settings
+
+# Oldest spellings are forgotten first once the file holds this many
+MAX_LOCATIONS = 5000
+# Ids learned within this many seconds are written to disk together
+FLUSH_DELAY_SECONDS = 1.0
+
+
+def normalize_query(city: str) -> str:
+    """Canonical form of a city query: ``"  Manila ,ph "`` -> ``"manila,ph"``."""
+    parts = (" ".join(part.split()) for part in city.lower().split(","))
+    return ",".join(part for part in parts if part)
+
+
+class LocationResolver:
+    """Persistent mapping of normalized city queries to city ids."""
+
+    def __init__(self, path: Optional[Path] = None, flush_delay: Optional[float] = None):
+        # Nothing is read until load(); until then every query is sent by name
+        self.path = path if path is not None else settings.LOCATIONS_FILE
+        self.flush_delay = flush_delay if flush_delay is not None else FLUSH_DELAY_SECONDS
+        # normalized query -> city id, oldest first
+        self._ids: Dict[str, int] = {}
+        self._dirty = False
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+        self._writing: Optional["asyncio.Future[None]"] = None
+
+    async def load(self):
+        """
+        Read the mapping file in a worker thread and merge it into memory.
+
+        Ids learned before the file finished loading win, and stay the newest.
+        """
+        ids = await asyncio.to_thread(self._read)
+        learned = self._ids
+        self._ids = {key: location_id for key, location_id in ids.items() if key not in learned}
+        self._ids.update(learned)
+        self._prune()
+
+    def _read(self) -> Dict[str, int]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return {str(k): int(v) for k, v in data.items()}
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, ValueError, TypeError, OSError) as e:
+            print(f"Error loading locations: {e}")
+        return {}
+
+    def _prune(self):
+        """Forget the oldest spellings beyond ``MAX_LOCATIONS``."""
+        while len(self._ids) > MAX_LOCATIONS:
+            del self._ids[next(iter(self._ids))]
+
+    def resolve(self, city: str) -> Optional[int]:
+        """City id for ``city``, or None if this spelling has not been seen."""
+        return self._ids.get(normalize_query(city))
+
+    def cache_key(self, city: str) -> str:
+        """Key for cache entries and in-flight requests for ``city``."""
+        location_id = self.resolve(city)
+        if location_id is not None:
+            return f"id_{location_id}"
+        return normalize_query(city)
+
+    def query_params(self, city: str) -> Dict[str, Any]:
+        """Request parameters identifying ``city``: by id when known, else by name."""
+        location_id = self.resolve(city)
+        if location_id is not None:
+            return {"id": location_id}
+        return {"q": city.strip()}
+
+    def learn(self, city: str, location_id: Any) -> str:
+        """
+        Remember the id a response reported for ``city``.
+
+        Returns:
+            The cache key to store the response under
+        """
+        key = normalize_query(city)
+        if not key or not isinstance(location_id, int) or location_id <= 0:
+            return self.cache_key(city)
+        if self._ids.get(key) != location_id:
+            self._ids.pop(key, None)
+            self._ids[key] = location_id
+            self._prune()
+            self._dirty = True
+            self._schedule_flush()
+        return f"id_{location_id}"
+
+    def _schedule_flush(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+        except RuntimeError:
+            # No event loop (scripts): write immediately
+            self._dirty = False
+            try:
+                self._write(dict(self._ids))
+            except OSError as e:
+                print(f"Error saving locations: {e}")
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        # Ids learned during a write are picked up by the next pass
+        while self._dirty:
+            await self._flush_now()
+
+    async def _flush_now(self):
+        self._dirty = False
+        # The copy is taken on the event loop thread, so the worker never
+        # sees a half-updated dict
+        self._writing = asyncio.ensure_future(asyncio.to_thread(self._write, dict(self._ids)))
+        await self._wait_for_write()
+
+    async def _wait_for_write(self):
+        # Shielded: cancelling the flush task must not start a second write
+        # while the worker thread is still replacing the file
+        try:
+            await asyncio.shield(self._writing)
+        except OSError as e:
+            print(f"Error saving locations: {e}")
+
+    async def aclose(self):
+        """Write pending changes now instead of after the delay."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        if self._writing is not None and not self._writing.done():
+            await self._wait_for_write()
+        if self._dirty:
+            await self._flush_now()
+
+    def _write(self, ids: Dict[str, int]):
+        """Write the mapping atomically, so a crash never leaves a partial file."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(ids, f)
+        os.replace(tmp_path, self.path)
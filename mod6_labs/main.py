@@ -1,12 +1,17 @@
 """Weather Application with enhanced features."""
-import json
+import asyncio
 import os
-from datetime import datetime
 from pathlib import Path
 from typing import Optional, List
 import flet as ft
-from weather_service import WeatherService
-from config import HISTORY_FILE, MAX_HISTORY_ITEMS, OPENWEATHER_API_KEY
+from city_search import PrefixIndex, load_city_list, normalize
+from config import settings
+from history_store import HistoryStore
+from models import CurrentWeather, Forecast
+from weather_views import CurrentWeatherView, ForecastView, SuggestionList
+
+# weather_service (httpx), prefetch and forecast_processing (NumPy) are
+# imported where they are first used, after the first frame is on screen.
 
 
 class WeatherApp:
@@ -14,20 +19,40 @@ class WeatherApp:
     
     def __init__(self, page: ft.Page):
         self.page = page
-        self.weather_service = WeatherService()
         self.current_unit = "metric"  # 'metric' for Celsius, 'imperial' for Fahrenheit
         self.current_city = ""
-        self.current_weather_data = None
-        self.forecast_data = None
+        self.current_weather_data: Optional[CurrentWeather] = None
+        self.forecast_data: Optional[Forecast] = None
+        
+        # Search history is loaded in the background after the first frame
+        self.search_history: List[str] = []
+        
+        # Type-ahead index (history + bundled city list), filled in the background
+        self.city_index = PrefixIndex()
         
-        # Load search history
-        self.search_history = self.load_history()
+        # Only the newest search may render; older ones are cancelled or ignored
+        self._search_seq = 0
+        self._search_task = None
+        self._suggest_task = None
         
         # Setup page
         self.setup_page()
         
-        # Build UI
+        # Build UI (paints the first frame before any disk work)
         self.build_ui()
+        
+        # Settings are resolved on first use, after the UI is on screen
+        from weather_service import WeatherService
+        self.weather_service = WeatherService()
+        
+        # In-memory history, written back in batches; search_history is what the dropdown shows
+        self.history = HistoryStore()
+        
+        # Keep the on-disk cache bounded for long-running sessions
+        self.cache_sweeper = self.page.run_task(self.weather_service.run_cache_sweeper)
+        
+        # Load history, then keep recent cities warm
+        self.startup_task = self.page.run_task(self.start_background_work)
     
     def setup_page(self):
         """Configure page settings."""
@@ -35,39 +60,50 @@ class WeatherApp:
         self.page.theme_mode = ft.ThemeMode.LIGHT
         self.page.padding = 20
         self.page.bgcolor = "#ECEFF1"  # Blue grey 50
+        self.page.on_close = self.on_page_close
     
-    def load_history(self) -> List[str]:
-        """Load search history from file."""
-        if HISTORY_FILE.exists():
+    async def on_page_close(self, e):
+        """Stop background tasks and release pooled HTTP connections."""
+        self.cache_sweeper.cancel()
+        self.startup_task.cancel()
+        for task in (self._search_task, self._suggest_task):
+            if task is not None:
+                task.cancel()
+        await self.weather_service.aclose()
+        await self.history.aclose()
+        if self.weather_service.metrics.enabled and settings.METRICS_FILE:
             try:
-                with open(HISTORY_FILE, 'r') as f:
-                    history = json.load(f)
-                    return history[:MAX_HISTORY_ITEMS] if isinstance(history, list) else []
-            except (json.JSONDecodeError, IOError):
-                return []
-        return []
+                await asyncio.to_thread(self.weather_service.metrics.write, settings.METRICS_FILE)
+            except OSError as e:
+                print(f"Error writing metrics: {e}")
     
-    def save_history(self):
-        """Save search history to file."""
-        try:
-            with open(HISTORY_FILE, 'w') as f:
-                json.dump(self.search_history, f)
-        except IOError as e:
-            print(f"Error saving history: {e}")
+    async def start_background_work(self):
+        """Load search history and known cities off the UI path, then warm the cache for them."""
+        # Cities searched while history was loading stay at the top
+        await asyncio.gather(self.history.load(), self.weather_service.locations.load())
+        self.search_history = self.history.recent(settings.MAX_HISTORY_ITEMS)
+        self.update_history_display()
+        
+        self.city_index.add(await asyncio.to_thread(load_city_list))
+        self.city_index.set_recent(self.history.ranked())
+        
+        # Keep recent history cities warm so selecting one renders instantly;
+        # in cache-only mode there is no network to warm from
+        from weather_service import MODE_CACHE_ONLY
+        if settings.PREFETCH_ENABLED and self.weather_service.mode != MODE_CACHE_ONLY:
+            from prefetch import CacheWarmer
+            await CacheWarmer(self.weather_service, lambda: self.search_history).run()
     
     def add_to_history(self, city: str):
-        """Add city to search history."""
+        """Add city to search history (written to disk in the background)."""
         city = city.strip()
         if not city:
             return
         
-        # Remove if exists and add to front
-        if city in self.search_history:
-            self.search_history.remove(city)
-        
-        self.search_history.insert(0, city)
-        self.search_history = self.search_history[:MAX_HISTORY_ITEMS]
-        self.save_history()
+        self.history.record(city)
+        self.search_history = self.history.recent(settings.MAX_HISTORY_ITEMS)
+        # Suggestions rank every remembered city by how often and how recently it was searched
+        self.city_index.set_recent(self.history.ranked())
         self.update_history_display()
     
     def update_history_display(self):
@@ -76,6 +112,7 @@ class WeatherApp:
             self.history_dropdown.options = [
                 ft.dropdown.Option(city) for city in self.search_history
             ]
+            self.history_dropdown.visible = len(self.search_history) > 0
             self.history_dropdown.update()
     
     def build_ui(self):
@@ -98,9 +135,13 @@ class WeatherApp:
             hint_text="e.g., London, New York, Tokyo",
             expand=True,
             on_submit=self.on_search,
+            on_change=self.on_city_input_change,
             autofocus=True,
         )
         
+        # Type-ahead suggestions below the search box
+        self.suggestions = SuggestionList(self.on_suggestion_select)
+        
         self.search_btn = ft.ElevatedButton(
             "Search",
             icon="search",
@@ -151,20 +192,10 @@ class WeatherApp:
             visible=False,
         )
         
-        # Weather display container
+        # Weather display container (controls are built once, then updated in place)
+        self.weather_view = CurrentWeatherView()
         self.weather_container = ft.Container(
-            content=ft.Column(
-                controls=[
-                    ft.Text(
-                        "Search for a city to see weather information",
-                        size=18,
-                        color="#757575",  # Grey 600
-                        text_align=ft.TextAlign.CENTER,
-                    ),
-                ],
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=10,
-            ),
+            content=self.weather_view.control,
             padding=20,
             border_radius=10,
             bgcolor="#FFFFFF",  # White
@@ -172,11 +203,9 @@ class WeatherApp:
         )
         
         # Forecast container
+        self.forecast_view = ForecastView(days=5)
         self.forecast_container = ft.Container(
-            content=ft.Column(
-                controls=[],
-                spacing=10,
-            ),
+            content=self.forecast_view.control,
             padding=20,
             border_radius=10,
             bgcolor="#FFFFFF",  # White
@@ -211,6 +240,7 @@ class WeatherApp:
         self.page.add(
             header,
             search_row,
+            self.suggestions.control,
             ft.Container(
                 content=self.history_dropdown,
                 padding=ft.padding.only(top=10, bottom=10),
@@ -222,13 +252,13 @@ class WeatherApp:
             self.forecast_container,
         )
     
-    def on_history_select(self, e):
+    async def on_history_select(self, e):
         """Handle history dropdown selection."""
         if e.control.value:
             self.city_input.value = e.control.value
-            self.on_search(e)
+            await self.on_search(e)
     
-    def on_unit_toggle(self, e):
+    async def on_unit_toggle(self, e):
         """Handle temperature unit toggle."""
         if e.control.value:
             self.current_unit = "imperial"
@@ -237,344 +267,131 @@ class WeatherApp:
         
         # If we have current weather, refresh it with new units
         if self.current_city:
-            self.page.run_task(self.get_weather, self.current_city)
+            self.start_search(self.current_city)
     
-    def on_search(self, e):
+    async def on_search(self, e):
         """Handle search button click."""
         city = self.city_input.value.strip()
         if not city:
             self.show_error("Please enter a city name")
             return
         
+        self.hide_suggestions()
+        self.start_search(city)
+    
+    async def on_city_input_change(self, e):
+        """Restart the debounce window on every keystroke."""
+        if self._suggest_task is not None:
+            self._suggest_task.cancel()
+        self._suggest_task = self.page.run_task(self.suggest_cities, e.control.value or "")
+    
+    async def suggest_cities(self, text: str):
+        """Once typing pauses, show suggestions and search an exactly matching known city."""
+        await asyncio.sleep(settings.SEARCH_DEBOUNCE_MS / 1000)
+        
+        cities = self.city_index.suggest(text, limit=len(self.suggestions.buttons))
+        recent = sum(1 for city in cities if self.city_index.is_recent(city))
+        self.suggestions.show(cities, recent)
+        self.suggestions.control.update()
+        
+        city = text.strip()
+        if city in self.city_index and normalize(city) != normalize(self.current_city):
+            self.start_search(city)
+    
+    def on_suggestion_select(self, city: str):
+        """Search a suggested city."""
+        self.city_input.value = city
+        self.city_input.update()
+        self.hide_suggestions()
+        self.start_search(city)
+    
+    def hide_suggestions(self):
+        """Drop pending suggestions and hide the list."""
+        if self._suggest_task is not None:
+            self._suggest_task.cancel()
+            self._suggest_task = None
+        if self.suggestions.control.visible:
+            self.suggestions.hide()
+            self.suggestions.control.update()
+    
+    def start_search(self, city: str):
+        """Search ``city``, cancelling any search still in flight."""
         self.current_city = city
         self.hide_error()
-        self.page.run_task(self.get_weather, city)
+        if self._search_task is not None:
+            self._search_task.cancel()
+        self._search_seq += 1
+        self._search_task = self.page.run_task(self.get_weather, city, self._search_seq)
+    
+    def is_current_search(self, seq: Optional[int]) -> bool:
+        """False once a newer search has started, so late responses are dropped."""
+        return seq is None or seq == self._search_seq
     
     def on_refresh_forecast(self, e):
         """Refresh the 5-day forecast."""
         if self.current_city:
-            self.page.run_task(self.get_forecast, self.current_city)
+            self.page.run_task(self.get_forecast, self.current_city, self._search_seq)
     
-    async def get_weather(self, city: str):
+    async def get_weather(self, city: str, seq: Optional[int] = None):
         """Fetch weather data for a city."""
         # Show loading
-        self.weather_container.content = ft.Column(
-            controls=[
-                ft.ProgressRing(),
-                ft.Text("Loading weather data...", size=16),
-            ],
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            spacing=10,
-        )
+        self.weather_view.show_loading()
         self.weather_container.visible = True
         self.weather_container.update()
         
         try:
-            data = await self.weather_service.get_weather(city, self.current_unit)
+            # Cached data may be returned (with its age) while a refresh runs
+            data, age = await self.weather_service.get_weather_with_age(city, self.current_unit)
+            if not self.is_current_search(seq):
+                return
             self.current_weather_data = data
             self.add_to_history(city)
-            self.display_weather(data)
+            self.display_weather(data, age)
             
             # Automatically load forecast
-            await self.get_forecast(city)
+            await self.get_forecast(city, seq)
             
         except Exception as e:
+            if not self.is_current_search(seq):
+                return
             self.show_error(str(e))
             self.weather_container.visible = False
             self.weather_container.update()
     
-    async def get_forecast(self, city: str):
+    async def get_forecast(self, city: str, seq: Optional[int] = None):
         """Fetch 5-day forecast for a city."""
         try:
             data = await self.weather_service.get_forecast(city, self.current_unit)
+            if not self.is_current_search(seq):
+                return
             self.forecast_data = data
             self.display_forecast(data)
         except Exception as e:
             # Don't show error for forecast, just log it
             print(f"Forecast error: {e}")
     
-    def display_weather(self, data: dict):
+    def display_weather(self, data: CurrentWeather, age: float = 0.0):
         """Display weather information."""
-        main = data.get("main", {})
-        weather = data.get("weather", [{}])[0]
-        wind = data.get("wind", {})
-        
-        temp = main.get("temp", 0)
-        feels_like = main.get("feels_like", 0)
-        humidity = main.get("humidity", 0)
-        pressure = main.get("pressure", 0)
-        description = weather.get("description", "N/A").title()
-        icon_code = weather.get("icon", "01d")
-        wind_speed = wind.get("speed", 0)
-        city_name = data.get("name", "Unknown")
-        country = data.get("sys", {}).get("country", "")
-        
-        # Weather icon URL
-        icon_url = f"https://openweathermap.org/img/wn/{icon_code}@2x.png"
-        
-        # Unit symbol
-        unit_symbol = "°F" if self.current_unit == "imperial" else "°C"
-        wind_unit = "mph" if self.current_unit == "imperial" else "m/s"
-        
-        # Background color based on weather condition
-        bg_color = self.get_weather_color(description.lower())
-        
-        self.weather_container.content = ft.Column(
-            controls=[
-                # City name
-                ft.Text(
-                    f"{city_name}, {country}",
-                    size=24,
-                    weight=ft.FontWeight.BOLD,
-                    color="#0D47A1",  # Blue 900
-                ),
-                
-                # Weather icon and temperature
-                ft.Row(
-                    controls=[
-                        ft.Image(
-                            src=icon_url,
-                            width=100,
-                            height=100,
-                        ),
-                        ft.Text(
-                            f"{temp:.1f}{unit_symbol}",
-                            size=48,
-                            weight=ft.FontWeight.BOLD,
-                            color="#1976D2",  # Blue 700
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.CENTER,
-                    spacing=10,
-                ),
-                
-                # Description
-                ft.Text(
-                    description,
-                    size=20,
-                    color="#616161",  # Grey 700
-                ),
-                
-                # Details row
-                ft.Container(
-                    content=ft.Row(
-                        controls=[
-                            # Feels like
-                            ft.Column(
-                                controls=[
-                                    ft.Text(
-                                        "Feels Like",
-                                        size=12,
-                                        color="#757575",  # Grey 600
-                                    ),
-                                    ft.Text(
-                                        f"{feels_like:.1f}{unit_symbol}",
-                                        size=18,
-                                        weight=ft.FontWeight.W_500,
-                                    ),
-                                ],
-                                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                                spacing=5,
-                            ),
-                            
-                            # Humidity
-                            ft.Column(
-                                controls=[
-                                    ft.Text(
-                                        "Humidity",
-                                        size=12,
-                                        color="#757575",  # Grey 600
-                                    ),
-                                    ft.Text(
-                                        f"{humidity}%",
-                                        size=18,
-                                        weight=ft.FontWeight.W_500,
-                                    ),
-                                ],
-                                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                                spacing=5,
-                            ),
-                            
-                            # Wind Speed
-                            ft.Column(
-                                controls=[
-                                    ft.Text(
-                                        "Wind Speed",
-                                        size=12,
-                                        color="#757575",  # Grey 600
-                                    ),
-                                    ft.Text(
-                                        f"{wind_speed:.1f} {wind_unit}",
-                                        size=18,
-                                        weight=ft.FontWeight.W_500,
-                                    ),
-                                ],
-                                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                                spacing=5,
-                            ),
-                            
-                            # Pressure
-                            ft.Column(
-                                controls=[
-                                    ft.Text(
-                                        "Pressure",
-                                        size=12,
-                                        color="#757575",  # Grey 600
-                                    ),
-                                    ft.Text(
-                                        f"{pressure} hPa",
-                                        size=18,
-                                        weight=ft.FontWeight.W_500,
-                                    ),
-                                ],
-                                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                                spacing=5,
-                            ),
-                        ],
-                        alignment=ft.MainAxisAlignment.SPACE_EVENLY,
-                        spacing=20,
-                    ),
-                    padding=ft.padding.only(top=20),
-                ),
-            ],
-            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-            spacing=15,
-        )
-        
-        self.weather_container.bgcolor = bg_color
+        # Only changed properties are sent to the client
+        self.weather_view.show(data, self.current_unit, age)
+        self.weather_container.bgcolor = self.get_weather_color(data.description.lower())
         self.weather_container.visible = True
         self.weather_container.update()
     
-    def display_forecast(self, data: dict):
+    def display_forecast(self, data: Forecast):
         """Display 5-day weather forecast."""
-        if not data or "list" not in data:
+        if not data or not data.slots:
             return
         
-        forecast_list = data.get("list", [])
+        from forecast_processing import daily_summaries
         
-        # Group by date (take one forecast per day, around noon)
-        daily_forecasts = {}
-        for item in forecast_list:
-            date = item.get("dt_txt", "").split(" ")[0]
-            if date not in daily_forecasts:
-                daily_forecasts[date] = item
-            else:
-                # Prefer forecasts around 12:00
-                current_time = item.get("dt_txt", "").split(" ")[1]
-                if "12:00" in current_time or "15:00" in current_time:
-                    daily_forecasts[date] = item
-        
-        # Limit to 5 days
-        forecast_items = list(daily_forecasts.values())[:5]
+        # One entry per local day, represented by the slot nearest noon
+        forecast_items = daily_summaries(data, days=5)
         
         if not forecast_items:
             return
         
-        unit_symbol = "°F" if self.current_unit == "imperial" else "°C"
-        
-        forecast_cards = []
-        for item in forecast_items:
-            main = item.get("main", {})
-            weather = item.get("weather", [{}])[0]
-            wind = item.get("wind", {})
-            
-            temp = main.get("temp", 0)
-            temp_min = main.get("temp_min", 0)
-            temp_max = main.get("temp_max", 0)
-            description = weather.get("description", "N/A").title()
-            icon_code = weather.get("icon", "01d")
-            humidity = main.get("humidity", 0)
-            wind_speed = wind.get("speed", 0)
-            date_str = item.get("dt_txt", "")
-            
-            # Format date
-            try:
-                dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                day_name = dt.strftime("%A")
-                date_display = dt.strftime("%b %d")
-            except:
-                day_name = "Unknown"
-                date_display = date_str
-            
-            icon_url = f"https://openweathermap.org/img/wn/{icon_code}@2x.png"
-            wind_unit = "mph" if self.current_unit == "imperial" else "m/s"
-            
-            card = ft.Card(
-                content=ft.Container(
-                    content=ft.Column(
-                        controls=[
-                            # Date
-                            ft.Text(
-                                day_name,
-                                size=16,
-                                weight=ft.FontWeight.BOLD,
-                                color="#0D47A1",  # Blue 900
-                            ),
-                            ft.Text(
-                                date_display,
-                                size=12,
-                                color="#757575",  # Grey 600
-                            ),
-                            
-                            # Icon and temp
-                            ft.Row(
-                                controls=[
-                                    ft.Image(
-                                        src=icon_url,
-                                        width=60,
-                                        height=60,
-                                    ),
-                                    ft.Column(
-                                        controls=[
-                                            ft.Text(
-                                                f"{temp:.0f}{unit_symbol}",
-                                                size=24,
-                                                weight=ft.FontWeight.BOLD,
-                                            ),
-                                            ft.Text(
-                                                f"{temp_min:.0f}° / {temp_max:.0f}°",
-                                                size=12,
-                                                color="#757575",  # Grey 600
-                                            ),
-                                        ],
-                                        spacing=2,
-                                    ),
-                                ],
-                                alignment=ft.MainAxisAlignment.CENTER,
-                            ),
-                            
-                            # Description
-                            ft.Text(
-                                description,
-                                size=12,
-                                color="#616161",  # Grey 700
-                                text_align=ft.TextAlign.CENTER,
-                            ),
-                            
-                            # Details
-                            ft.Row(
-                                controls=[
-                                    ft.Text(f"💧 {humidity}%", size=11),
-                                    ft.Text(f"💨 {wind_speed:.1f} {wind_unit}", size=11),
-                                ],
-                                alignment=ft.MainAxisAlignment.CENTER,
-                                spacing=10,
-                            ),
-                        ],
-                        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                        spacing=8,
-                    ),
-                    padding=15,
-                ),
-                elevation=2,
-            )
-            
-            forecast_cards.append(card)
-        
-        self.forecast_container.content = ft.Column(
-            controls=forecast_cards,
-            spacing=10,
-        )
+        self.forecast_view.show(forecast_items, self.current_unit)
         self.forecast_container.visible = True
         self.forecast_header.visible = True
         self.forecast_container.update()
@@ -613,8 +430,11 @@ class WeatherApp:
 
 def main(page: ft.Page):
     """Main entry point."""
-    # Verify API key is loaded
-    if not OPENWEATHER_API_KEY or OPENWEATHER_API_KEY.strip() == "":
+    app = WeatherApp(page)
+    
+    # Verify API key is loaded (after the first frame is on screen)
+    api_key = settings.OPENWEATHER_API_KEY
+    if not api_key or api_key.strip() == "":
         # Show error in UI
         error_dialog = ft.AlertDialog(
             title=ft.Text("API Key Not Found"),
@@ -635,9 +455,7 @@ def main(page: ft.Page):
         page.update()
         print("ERROR: API key not found. Check .env file.")
     else:
-        print(f"API key loaded: {OPENWEATHER_API_KEY[:10]}... (length: {len(OPENWEATHER_API_KEY)})")
-    
-    app = WeatherApp(page)
+        print(f"API key loaded: {api_key[:10]}... (length: {len(api_key)})")
 
 
 if __name__ == "__main__":
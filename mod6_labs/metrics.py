@@ -0,0 +1,256 @@
+"""Small in-process metrics registry.
+
+Counters, gauges and histograms are created by name on a ``MetricsRegistry``
+and can be exported as JSON or in the Prometheus text format. Each metric
+has a fixed list of label names; samples are recorded by passing the label
+values positionally::
+
+    hits = registry.counter("cache_lookups_total", "Cache lookups", ("cache", "result"))
+    hits.inc("weather", "hit")
+
+Instrumentation is opt-in (``METRICS_ENABLED``). When it is off,
+``get_registry()`` returns a registry whose metrics ignore every call, so
+instrumented code pays only for a no-op method call.
+"""
+import json
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+
+# Upper bounds in seconds, tuned for HTTP round trips
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _check(self, values: LabelValues) -> LabelValues:
+        if len(values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {values}")
+        return values
+
+    def samples(self) -> List[Tuple[LabelValues, Any]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        key = self._check(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(tuple(label_values), 0.0)
+
+    def samples(self) -> List[Tuple[LabelValues, Any]]:
+        with self._lock:
+            return sorted(self._values.items())
+
+
+class Gauge(Counter):
+    """Value that can go up and down, such as requests in flight."""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float):
+        key = self._check(label_values)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, *label_values: str, value: float):
+        key = self._check(label_values)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[Tuple[LabelValues, Any]]:
+        with self._lock:
+            result = []
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative, running = [], 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    running += bucket_count
+                    cumulative.append((bound, running))
+                result.append((key, {"buckets": cumulative, "sum": total, "count": count}))
+            return result
+
+
+class MetricsRegistry:
+    """Named metrics, created on first request and shared afterwards."""
+
+    enabled = True
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labels: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif type(metric) is not cls or metric.labels != tuple(labels):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Every metric with its samples, keyed by metric name."""
+        result = {}
+        for name, metric in sorted(self._metrics.items()):
+            samples = []
+            for values, value in metric.samples():
+                sample = {"labels": dict(zip(metric.labels, values))}
+                if metric.kind == "histogram":
+                    sample.update(value)
+                    sample["buckets"] = [
+                        ["+Inf" if bound == float("inf") else bound, count]
+                        for bound, count in value["buckets"]
+                    ]
+                else:
+                    sample["value"] = value
+                samples.append(sample)
+            result[name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+        return result
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for values, value in metric.samples():
+                labels = list(zip(metric.labels, values))
+                if metric.kind == "histogram":
+                    for bound, count in value["buckets"]:
+                        le = "+Inf" if bound == float("inf") else _format_number(bound)
+                        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to ``path``: Prometheus text for ``.prom`` files, else JSON."""
+        text = self.to_prometheus() if str(path).endswith(".prom") else self.to_json()
+        with open(path, "w") as f:
+            f.write(text)
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _NullMetric:
+    """Stands in for every metric type when instrumentation is off."""
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        pass
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        pass
+
+    def set(self, *label_values: str, value: float):
+        pass
+
+    def observe(self, *label_values: str, value: float):
+        pass
+
+
+class NullRegistry(MetricsRegistry):
+    """Registry that records nothing."""
+
+    enabled = False
+    _null = _NullMetric()
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Any:
+        return self._null
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Any:
+        return self._null
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Any:
+        return self._null
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_registry() -> MetricsRegistry:
+    """The process-wide registry: a real one if ``METRICS_ENABLED`` is set, else a no-op one."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry() if settings.METRICS_ENABLED else NullRegistry()
+    return _registry
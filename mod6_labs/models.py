@@ -0,0 +1,179 @@
+"""Compact typed models for weather and forecast data.
+
+API responses are parsed into these models once, at the service boundary,
+keeping only the fields the UI uses. Each model serializes to a flat list
+of values in field order (``to_row``/``from_row``), which is what the cache
+stores instead of the full raw response.
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List
+
+
+def _first_condition(item: Dict[str, Any]) -> Dict[str, Any]:
+    return (item.get("weather") or [{}])[0]
+
+
+@dataclass
+class CurrentWeather:
+    """Current conditions for one city."""
+
+    __slots__ = (
+        "city", "country", "dt", "timezone",
+        "temp", "feels_like", "temp_min", "temp_max",
+        "humidity", "pressure", "wind_speed",
+        "condition_id", "description", "icon",
+    )
+
+    city: str
+    country: str
+    dt: int
+    timezone: int
+    temp: float
+    feels_like: float
+    temp_min: float
+    temp_max: float
+    humidity: int
+    pressure: int
+    wind_speed: float
+    condition_id: int
+    description: str
+    icon: str
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "CurrentWeather":
+        """Parse an OpenWeatherMap ``/weather`` response."""
+        main = data.get("main", {})
+        weather = _first_condition(data)
+        return cls(
+            city=data.get("name", "Unknown"),
+            country=data.get("sys", {}).get("country", ""),
+            dt=data.get("dt", 0),
+            timezone=data.get("timezone", 0),
+            temp=main.get("temp", 0),
+            feels_like=main.get("feels_like", 0),
+            temp_min=main.get("temp_min", 0),
+            temp_max=main.get("temp_max", 0),
+            humidity=main.get("humidity", 0),
+            pressure=main.get("pressure", 0),
+            wind_speed=data.get("wind", {}).get("speed", 0),
+            condition_id=weather.get("id", 0),
+            description=weather.get("description", "N/A"),
+            icon=weather.get("icon", "01d"),
+        )
+
+    def to_row(self) -> List[Any]:
+        return [getattr(self, field) for field in self.__slots__]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "CurrentWeather":
+        return cls(*row)
+
+
+@dataclass
+class ForecastSlot:
+    """One 3-hour step of the 5-day forecast."""
+
+    __slots__ = (
+        "dt", "temp", "feels_like", "temp_min", "temp_max",
+        "humidity", "wind_speed", "condition_id", "description", "icon",
+    )
+
+    dt: int
+    temp: float
+    feels_like: float
+    temp_min: float
+    temp_max: float
+    humidity: int
+    wind_speed: float
+    condition_id: int
+    description: str
+    icon: str
+
+    @classmethod
+    def from_api(cls, item: Dict[str, Any]) -> "ForecastSlot":
+        """Parse one entry of a ``/forecast`` response's ``list``."""
+        main = item.get("main", {})
+        weather = _first_condition(item)
+        return cls(
+            dt=item.get("dt", 0),
+            temp=main.get("temp", 0),
+            feels_like=main.get("feels_like", 0),
+            temp_min=main.get("temp_min", 0),
+            temp_max=main.get("temp_max", 0),
+            humidity=main.get("humidity", 0),
+            wind_speed=item.get("wind", {}).get("speed", 0),
+            condition_id=weather.get("id", 0),
+            description=weather.get("description", "N/A"),
+            icon=weather.get("icon", "01d"),
+        )
+
+    def to_row(self) -> List[Any]:
+        return [getattr(self, field) for field in self.__slots__]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "ForecastSlot":
+        return cls(*row)
+
+
+@dataclass
+class Forecast:
+    """5-day forecast for one city: location details plus its 3-hour slots."""
+
+    __slots__ = ("city", "country", "timezone", "slots")
+
+    city: str
+    country: str
+    timezone: int
+    slots: List[ForecastSlot]
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "Forecast":
+        """Parse an OpenWeatherMap ``/forecast`` response."""
+        city = data.get("city", {})
+        return cls(
+            city=city.get("name", "Unknown"),
+            country=city.get("country", ""),
+            timezone=city.get("timezone", 0),
+            slots=[ForecastSlot.from_api(item) for item in data.get("list", [])],
+        )
+
+    def to_row(self) -> List[Any]:
+        return [self.city, self.country, self.timezone, [slot.to_row() for slot in self.slots]]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "Forecast":
+        city, country, timezone, slots = row
+        return cls(city, country, timezone, [ForecastSlot.from_row(slot) for slot in slots])
+
+
+@dataclass
+class DailySummary:
+    """One day of the forecast as shown on a forecast card."""
+
+    __slots__ = (
+        "date", "dt", "temp", "temp_min", "temp_max", "temp_mean",
+        "humidity", "wind_speed", "condition_id", "description", "icon", "slot_count",
+    )
+
+    date: date
+    dt: int
+    temp: float
+    temp_min: float
+    temp_max: float
+    temp_mean: float
+    humidity: int
+    wind_speed: float
+    condition_id: int
+    description: str
+    icon: str
+    slot_count: int
+
+    def to_row(self) -> List[Any]:
+        row = [getattr(self, field) for field in self.__slots__]
+        row[0] = self.date.toordinal()
+        return row
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "DailySummary":
+        return cls(date.fromordinal(row[0]), *row[1:])
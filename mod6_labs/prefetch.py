@@ -0,0 +1,74 @@
+"""Background warm-up of the weather and forecast caches for recent cities."""
+import asyncio
+from typing import Callable, List, Optional
+
+from config import settings
+from weather_service import WeatherCache, WeatherService
+
+
+class CacheWarmer:
+    """
+    Keeps the most recent history cities warm in the service's caches.
+    
+    On start every city without a fresh entry is refreshed; afterwards the
+    warmer sleeps until the next entry is about to expire and refreshes it
+    ``margin_seconds`` ahead of time. Requests go through the service, so
+    they are coalesced with user lookups and honour the shared rate limiter.
+    Cancel the task running ``run()`` to stop it.
+    """
+    
+    def __init__(
+        self,
+        service: WeatherService,
+        cities: Callable[[], List[str]],
+        count: Optional[int] = None,
+        margin_seconds: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+    ):
+        # Unset arguments fall back to settings
+        self.service = service
+        self.cities = cities
+        self.count = count if count is not None else settings.PREFETCH_HISTORY_COUNT
+        self.margin_seconds = margin_seconds if margin_seconds is not None else settings.PREFETCH_MARGIN_SECONDS
+        self.min_interval = min_interval if min_interval is not None else settings.PREFETCH_MIN_INTERVAL_SECONDS
+        self.max_interval = max_interval if max_interval is not None else settings.PREFETCH_MAX_INTERVAL_SECONDS
+    
+    @staticmethod
+    def _seconds_left(cache: WeatherCache, key: str) -> float:
+        """Seconds until ``key`` expires in ``cache`` (0 if missing or stale)."""
+        cached = cache.peek(key)
+        if cached is None:
+            return 0.0
+        return max(cache.expiry_seconds - cached[1], 0.0)
+    
+    async def warm_once(self) -> float:
+        """
+        Refresh every recent city that expires within the margin.
+        
+        Returns:
+            Seconds to wait before the next pass
+        """
+        targets = (
+            (self.service.cache, self.service.refresh_weather),
+            (self.service.forecast_cache, self.service.refresh_forecast),
+        )
+        next_pass = self.max_interval
+        for city in list(self.cities())[:self.count]:
+            for cache, refresh in targets:
+                seconds_left = self._seconds_left(cache, self.service.locations.cache_key(city))
+                if seconds_left <= self.margin_seconds:
+                    try:
+                        await refresh(city)
+                    except Exception as e:
+                        print(f"Prefetch error for {city}: {e}")
+                        continue
+                    seconds_left = cache.expiry_seconds
+                next_pass = min(next_pass, seconds_left - self.margin_seconds)
+        return max(next_pass, self.min_interval)
+    
+    async def run(self):
+        """Warm the caches until cancelled."""
+        while True:
+            delay = await self.warm_once()
+            await asyncio.sleep(delay)
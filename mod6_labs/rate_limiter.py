@@ -0,0 +1,120 @@
+"""Client-side rate limiting and retry policy for the OpenWeatherMap API."""
+import asyncio
+import random
+import time
+from typing import Iterable, Optional
+
+from config import settings
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Async token bucket shared by every request a ``WeatherService`` makes.
+
+    Tokens refill continuously at ``rate_per_minute`` up to ``burst``. Each
+    ``acquire()`` reserves one token; when none are left the caller sleeps
+    until its reservation is due, so waiting callers are served in order.
+    A rate of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate_per_minute: Optional[float] = None, burst: Optional[int] = None):
+        if rate_per_minute is None:
+            rate_per_minute = settings.RATE_LIMIT_PER_MINUTE
+        if burst is None:
+            burst = settings.RATE_LIMIT_BURST
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Tokens may go negative: that is the queue of reservations still waiting
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    async def acquire(self):
+        """Wait until the caller may send one request."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RetryPolicy:
+    """
+    Retry budget with jittered exponential backoff.
+
+    A request is retried at most ``max_attempts - 1`` times and never past
+    ``budget_seconds`` from its first attempt. Delays use "full jitter":
+    a random value between 0 and ``base_delay * 2 ** attempt``, capped at
+    ``max_delay``. A ``Retry-After`` value from the server takes precedence;
+    if it asks for longer than ``max_delay`` or the remaining budget, the
+    request is not retried, since retrying early would only fail again.
+    """
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        budget_seconds: Optional[float] = None,
+        retry_statuses: Iterable[int] = RETRYABLE_STATUS_CODES,
+    ):
+        # Unset arguments fall back to settings
+        self.max_attempts = max(max_attempts if max_attempts is not None else settings.RETRY_MAX_ATTEMPTS, 1)
+        self.base_delay = base_delay if base_delay is not None else settings.RETRY_BASE_DELAY_SECONDS
+        self.max_delay = max_delay if max_delay is not None else settings.RETRY_MAX_DELAY_SECONDS
+        self.budget_seconds = budget_seconds if budget_seconds is not None else settings.RETRY_BUDGET_SECONDS
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def should_retry(self, status_code: int) -> bool:
+        return status_code in self.retry_statuses
+
+    def next_delay(
+        self,
+        attempt: int,
+        started: float,
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        Delay before retrying after failed attempt number ``attempt`` (0-based).
+
+        Args:
+            attempt: Index of the attempt that just failed
+            started: ``time.monotonic()`` when the first attempt was made
+            retry_after: Server-requested delay in seconds, if any
+
+        Returns:
+            Seconds to sleep, or None if the retry budget is exhausted or
+            the server asked to wait longer than the policy allows
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        if retry_after is not None:
+            delay = max(retry_after, 0.0)
+            if delay > self.max_delay:
+                return None
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if time.monotonic() + delay - started > self.budget_seconds:
+            return None
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds; HTTP dates are ignored."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -1,169 +1,932 @@
 """Weather service for API integration and caching."""
-import json
+import asyncio
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Callable, Awaitable, Set, Iterable, Type, TypeVar, Union
 import httpx
-from config import (
-    OPENWEATHER_API_KEY,
-    OPENWEATHER_BASE_URL,
-    FORECAST_BASE_URL,
-    CACHE_DIR,
-    CACHE_EXPIRY_MINUTES
-)
+import cache_serializers
+from cache_serializers import Serializer, get_serializer
+from config import settings
+from locations import LocationResolver
+from metrics import MetricsRegistry, get_registry
+from models import CurrentWeather, Forecast, ForecastSlot
+from rate_limiter import TokenBucket, RetryPolicy, parse_retry_after
+
+# Unit system used for every upstream request and every cache entry
+CANONICAL_UNITS = "metric"
+TEMPERATURE_FIELDS = ("temp", "feels_like", "temp_min", "temp_max")
+MPH_PER_METRE_PER_SECOND = 2.2369362920544
+
+# Cache modes (``CACHE_MODE``)
+MODE_NETWORK = "network"              # fetch whenever the cache has no fresh entry
+MODE_OFFLINE_FIRST = "offline-first"  # serve any cached entry at once, refresh in background
+MODE_CACHE_ONLY = "cache-only"        # never touch the network
+CACHE_MODES = (MODE_NETWORK, MODE_OFFLINE_FIRST, MODE_CACHE_ONLY)
+
+Model = TypeVar("Model", CurrentWeather, Forecast)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``)."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _from_row(model: Type[Model], row: Any) -> Optional[Model]:
+    """Rebuild a model from its cached row; entries in any other format count as misses."""
+    if not isinstance(row, list):
+        return None
+    try:
+        return model.from_row(row)
+    except (TypeError, ValueError):
+        return None
 
 
 class WeatherCache:
-    """Handles caching of weather data to reduce API calls."""
+    """Handles caching of weather data to reduce API calls.
+
+    Two tiers are used: an in-memory LRU in front of one file per key on
+    disk. Files hold a small header and the data encoded by a pluggable
+    serializer (see ``cache_serializers``). Repeat lookups for hot cities
+    are answered from memory without touching the filesystem. Both tiers are
+    bounded by entry count and bytes; expired entries are dropped on access
+    and by ``sweep()``, which the app runs periodically in the background.
+    
+    With ``max_stale_minutes`` set, entries are kept that long past their
+    expiry so ``get_with_age`` can serve them while a refresh is in progress.
+    """
     
-    def __init__(self, cache_dir: Path = CACHE_DIR, expiry_minutes: int = CACHE_EXPIRY_MINUTES):
-        self.cache_dir = cache_dir
-        self.cache_dir.mkdir(exist_ok=True)
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        expiry_minutes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        disk_max_entries: Optional[int] = None,
+        disk_max_bytes: Optional[int] = None,
+        max_stale_minutes: int = 0,
+        serializer: Optional[Serializer] = None,
+        name: str = "weather",
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        # Unset arguments fall back to settings. The directory itself is only
+        # created on the first write, keeping disk work off the startup path.
+        self.cache_dir = cache_dir if cache_dir is not None else settings.CACHE_DIR
+        if expiry_minutes is None:
+            expiry_minutes = settings.CACHE_EXPIRY_MINUTES
         self.expiry_seconds = expiry_minutes * 60
+        self.retention_seconds = self.expiry_seconds + max_stale_minutes * 60
+        self.max_entries = max_entries if max_entries is not None else settings.CACHE_MEMORY_MAX_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else settings.CACHE_MEMORY_MAX_BYTES
+        self.disk_max_entries = (
+            disk_max_entries if disk_max_entries is not None else settings.CACHE_DISK_MAX_ENTRIES
+        )
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else settings.CACHE_DISK_MAX_BYTES
+        self.serializer = serializer or get_serializer(settings.CACHE_SERIALIZER)
+        self._dir_ready = False
+        # key -> (timestamp, data, size in bytes), least recently used first
+        self._memory: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        
+        # Instrumentation (no-ops unless METRICS_ENABLED)
+        self.name = name
+        metrics = metrics or get_registry()
+        self._lookups = metrics.counter(
+            "weather_cache_lookups_total", "Cache lookups by result (hit, stale, miss)", ("cache", "result")
+        )
+        self._tier_hits = metrics.counter(
+            "weather_cache_tier_hits_total", "Entries found, by cache tier (memory, disk)", ("cache", "tier")
+        )
+        self._evictions = metrics.counter(
+            "weather_cache_evictions_total", "Entries removed by LRU eviction or sweeps", ("cache", "tier")
+        )
     
     def _get_cache_file(self, city: str) -> Path:
         """Get cache file path for a city."""
-        return self.cache_dir / f"{city.lower().replace(' ', '_')}.json"
+        return self.cache_dir / f"{city.lower().replace(' ', '_')}.cache"
     
-    def get(self, city: str) -> Optional[Dict[str, Any]]:
-        """Get cached weather data if not expired."""
+    def _disk_write(self, city: str, timestamp: float, blob: bytes):
+        """Store an encoded entry in the disk tier."""
+        if not self._dir_ready:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        self._get_cache_file(city).write_bytes(blob)
+    
+    def _disk_read(self, city: str) -> Optional[Tuple[float, Any, int]]:
+        """Read ``(timestamp, data, size in bytes)`` from the disk tier; unreadable files are removed."""
         cache_file = self._get_cache_file(city)
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    cached = json.load(f)
-                    if time.time() - cached['timestamp'] < self.expiry_seconds:
-                        return cached['data']
-            except (json.JSONDecodeError, KeyError):
-                # Invalid cache file, remove it
-                cache_file.unlink()
+        try:
+            blob = cache_file.read_bytes()
+        except OSError:
+            return None
+        
+        try:
+            timestamp, data = cache_serializers.decode(blob)
+        except ValueError:
+            # Invalid cache file, remove it
+            cache_file.unlink(missing_ok=True)
+            return None
+        return timestamp, data, len(blob)
+    
+    def _is_expired(self, timestamp: float, now: Optional[float] = None) -> bool:
+        """True once an entry is past expiry and any stale grace period."""
+        return (now or time.time()) - timestamp >= self.retention_seconds
+    
+    def _memory_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Look up the memory tier, dropping the entry if it has expired."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            timestamp, data, size = entry
+            if self._is_expired(timestamp):
+                del self._memory[key]
+                self._memory_bytes -= size
+                return None
+            self._memory.move_to_end(key)
+            return timestamp, data
+    
+    def _memory_put(self, key: str, timestamp: float, data: Any, size: int):
+        """Insert into the memory tier and evict until it is within budget."""
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old[2]
+            if size > self.max_bytes or self.max_entries <= 0:
+                return
+            self._memory[key] = (timestamp, data, size)
+            self._memory_bytes += size
+            self._evict_memory()
+    
+    def _evict_memory(self):
+        """Drop expired entries first, then least recently used ones. Lock must be held."""
+        if len(self._memory) <= self.max_entries and self._memory_bytes <= self.max_bytes:
+            return
+        now = time.time()
+        for key in [k for k, (ts, _, _) in self._memory.items() if self._is_expired(ts, now)]:
+            self._memory_bytes -= self._memory.pop(key)[2]
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            _, (_, _, size) = self._memory.popitem(last=False)
+            self._memory_bytes -= size
+            self._evictions.inc(self.name, "memory")
+    
+    def _lookup(self, city: str, count: bool = True) -> Optional[Tuple[float, Any]]:
+        """Return ``(timestamp, data)`` from memory or disk, including stale entries."""
+        entry = self._memory_get(city)
+        if entry is not None:
+            if count:
+                self._tier_hits.inc(self.name, "memory")
+            return entry
+        
+        entry = self._disk_read(city)
+        if entry is not None and not self._is_expired(entry[0]):
+            if count:
+                self._tier_hits.inc(self.name, "disk")
+            timestamp, data, size = entry
+            self._memory_put(city, timestamp, data, size)
+            return timestamp, data
+        return None
+    
+    def get(self, city: str) -> Optional[Any]:
+        """Get cached weather data if not expired."""
+        entry = self._lookup(city)
+        if entry is not None and time.time() - entry[0] < self.expiry_seconds:
+            self._lookups.inc(self.name, "hit")
+            return entry[1]
+        self._lookups.inc(self.name, "miss")
         return None
     
-    def set(self, city: str, data: Dict[str, Any]):
+    def get_with_age(self, city: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get cached data and its age in seconds, even if it has gone stale.
+        
+        Callers compare the age with ``expiry_seconds`` to decide whether the
+        entry needs revalidating.
+        """
+        entry = self._lookup(city)
+        if entry is None:
+            self._lookups.inc(self.name, "miss")
+            return None
+        age = time.time() - entry[0]
+        self._lookups.inc(self.name, "hit" if age < self.expiry_seconds else "stale")
+        return entry[1], age
+    
+    def peek(self, city: str) -> Optional[Tuple[Any, float]]:
+        """
+        Like ``get_with_age``, but not counted in the cache metrics.
+        
+        For internal probes (batch lookups, prefetching) that are not lookups
+        a user made, so they do not skew the hit rate.
+        """
+        entry = self._lookup(city, count=False)
+        if entry is None:
+            return None
+        return entry[1], time.time() - entry[0]
+    
+    def set(self, city: str, data: Any):
         """Cache weather data with timestamp."""
-        cache_file = self._get_cache_file(city)
-        cached = {
-            'timestamp': time.time(),
-            'data': data
-        }
+        timestamp = time.time()
+        blob = cache_serializers.encode(self.serializer, timestamp, data)
+        self._memory_put(city, timestamp, data, len(blob))
         try:
-            with open(cache_file, 'w') as f:
-                json.dump(cached, f)
+            self._disk_write(city, timestamp, blob)
         except Exception as e:
             print(f"Error caching data: {e}")
+    
+    def sweep(self) -> int:
+        """
+        Remove expired entries and trim the disk tier to its budget.
+        
+        Returns:
+            Number of disk entries deleted
+        """
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (ts, _, _) in self._memory.items() if self._is_expired(ts, now)]:
+                self._memory_bytes -= self._memory.pop(key)[2]
+                self._evictions.inc(self.name, "memory")
+        removed = self._disk_sweep(now)
+        self._evictions.inc(self.name, "disk", amount=removed)
+        return removed
+    
+    def _disk_sweep(self, now: float) -> int:
+        """
+        Delete expired files, then the oldest ones until within budget.
+        
+        Files are aged by modification time, which ``set`` refreshes on every
+        write, so no file has to be opened to decide whether it has expired.
+        """
+        removed = 0
+        live = []
+        # .json files left by the original cache are never read; they age out
+        # and are deleted the same way
+        for cache_file in (*self.cache_dir.glob("*.cache"), *self.cache_dir.glob("*.json")):
+            try:
+                stat = cache_file.stat()
+                if self._is_expired(stat.st_mtime, now):
+                    cache_file.unlink()
+                    removed += 1
+                else:
+                    live.append((stat.st_mtime, stat.st_size, cache_file))
+            except OSError:
+                continue
+        
+        # Enforce the disk budget, oldest files first
+        live.sort()
+        remaining = len(live)
+        total_bytes = sum(size for _, size, _ in live)
+        for _, size, cache_file in live:
+            if remaining <= self.disk_max_entries and total_bytes <= self.disk_max_bytes:
+                break
+            try:
+                cache_file.unlink()
+            except OSError:
+                continue
+            removed += 1
+            remaining -= 1
+            total_bytes -= size
+        return removed
+    
+    async def run_sweeper(self, interval: Optional[float] = None):
+        """Sweep the cache forever, off the event loop, every ``interval`` seconds."""
+        if interval is None:
+            interval = settings.CACHE_SWEEP_INTERVAL_SECONDS
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                print(f"Error sweeping cache: {e}")
+            await asyncio.sleep(interval)
+    
+    def close(self):
+        """Release resources held by the disk tier."""
+
+
+class SQLiteWeatherCache(WeatherCache):
+    """WeatherCache whose disk tier is one shared SQLite database.
+    
+    Entries live in a single table keyed by ``(kind, city, units)``, so the
+    weather and forecast caches of several app instances can share one
+    database file. The database runs in WAL mode: readers never block the
+    writer, and every read or write is a single statement in its own
+    transaction, which makes them safe across processes. Each row stores the
+    time it may be purged (``expires_at``, indexed), so a sweep is one
+    ``DELETE``. The in-memory LRU tier works as in ``WeatherCache``.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            kind TEXT NOT NULL,
+            city TEXT NOT NULL,
+            units TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (kind, city, units)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS cache_entries_expires_at ON cache_entries (expires_at);
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        kind: str = "weather",
+        units: str = CANONICAL_UNITS,
+        expiry_minutes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        disk_max_entries: Optional[int] = None,
+        disk_max_bytes: Optional[int] = None,
+        max_stale_minutes: int = 0,
+        serializer: Optional[Serializer] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        # The database is opened on first use, like the file cache's directory
+        self.db_path = Path(db_path) if db_path is not None else settings.CACHE_DB_PATH
+        super().__init__(
+            self.db_path.parent,
+            expiry_minutes,
+            max_entries,
+            max_bytes,
+            disk_max_entries,
+            disk_max_bytes,
+            max_stale_minutes,
+            serializer,
+            kind,
+            metrics,
+        )
+        self.kind = kind
+        self.units = units
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use. ``_db_lock`` must be held."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit: each statement is its own transaction. The timeout
+            # waits out another process holding the write lock.
+            conn = sqlite3.connect(
+                str(self.db_path), timeout=5.0, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    def _key(self, city: str) -> Tuple[str, str, str]:
+        return self.kind, city.strip().lower(), self.units
+    
+    def _disk_read(self, city: str) -> Optional[Tuple[float, Any, int]]:
+        key = self._key(city)
+        try:
+            with self._db_lock:
+                row = self._connection().execute(
+                    "SELECT timestamp, data FROM cache_entries WHERE kind = ? AND city = ? AND units = ?",
+                    key,
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading cache database: {e}")
+            return None
+        if row is None:
+            return None
+        
+        timestamp, blob = row
+        try:
+            _, data = cache_serializers.decode(blob)
+        except ValueError:
+            # Invalid entry: remove it unless another process has replaced it
+            # meanwhile. Either way it is a miss, even if the delete fails.
+            try:
+                with self._db_lock:
+                    self._connection().execute(
+                        "DELETE FROM cache_entries"
+                        " WHERE kind = ? AND city = ? AND units = ? AND timestamp = ?",
+                        (*key, timestamp),
+                    )
+            except sqlite3.Error as e:
+                print(f"Error removing invalid cache entry: {e}")
+            return None
+        return timestamp, data, len(blob)
+    
+    def _disk_write(self, city: str, timestamp: float, blob: bytes):
+        with self._db_lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?)",
+                (*self._key(city), timestamp, timestamp + self.retention_seconds, blob),
+            )
+    
+    def _disk_sweep(self, now: float) -> int:
+        """Delete expired rows and, newest first, every row past the budget."""
+        with self._db_lock:
+            cursor = self._connection().execute(
+                """
+                DELETE FROM cache_entries
+                WHERE kind = :kind AND units = :units AND (
+                    expires_at <= :now
+                    OR city IN (
+                        SELECT city FROM (
+                            SELECT
+                                city,
+                                ROW_NUMBER() OVER newest AS position,
+                                SUM(length(data)) OVER newest AS total_bytes
+                            FROM cache_entries
+                            WHERE kind = :kind AND units = :units
+                            WINDOW newest AS (ORDER BY timestamp DESC ROWS UNBOUNDED PRECEDING)
+                        )
+                        WHERE position > :max_entries OR total_bytes > :max_bytes
+                    )
+                )
+                """,
+                {
+                    "kind": self.kind,
+                    "units": self.units,
+                    "now": now,
+                    "max_entries": self.disk_max_entries,
+                    "max_bytes": self.disk_max_bytes,
+                },
+            )
+            return cursor.rowcount
+    
+    def close(self):
+        """Close the database connection; it is reopened if the cache is used again."""
+        with self._db_lock:
+            if self._conn is not None:
+                conn, self._conn = self._conn, None
+                conn.close()
+
+
+def create_cache(
+    kind: str,
+    expiry_minutes: Optional[int] = None,
+    max_stale_minutes: int = 0,
+    metrics: Optional[MetricsRegistry] = None,
+) -> WeatherCache:
+    """
+    Build the cache for ``kind`` ('weather' or 'forecast') on the configured backend.
+    
+    With ``CACHE_BACKEND=sqlite`` every kind shares the database at
+    ``CACHE_DB_PATH``; otherwise weather files live in ``CACHE_DIR`` and
+    other kinds in a subdirectory named after the kind.
+    """
+    if settings.CACHE_BACKEND == "sqlite":
+        return SQLiteWeatherCache(
+            kind=kind,
+            expiry_minutes=expiry_minutes,
+            max_stale_minutes=max_stale_minutes,
+            metrics=metrics,
+        )
+    cache_dir = settings.CACHE_DIR if kind == "weather" else settings.CACHE_DIR / kind
+    return WeatherCache(
+        cache_dir, expiry_minutes, max_stale_minutes=max_stale_minutes, name=kind, metrics=metrics
+    )
 
 
 class WeatherService:
-    """Service for fetching weather data from OpenWeatherMap API."""
+    """Service for fetching weather data from OpenWeatherMap API.
+
+    A single ``httpx.AsyncClient`` is created on first use and reused for
+    every request, so lookups share pooled keep-alive connections instead
+    of paying a TCP/TLS handshake each time. Call ``aclose()`` when the app
+    shuts down to release the pool.
+    
+    Every upstream request passes through one shared token bucket, and
+    429/5xx responses and timeouts are retried with jittered backoff.
+    """
+    
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        forecast_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        mode: Optional[str] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        # Unset arguments fall back to settings
+        self.api_key = settings.OPENWEATHER_API_KEY
+        self.metrics = metrics or get_registry()
+        # City queries are sent and cached by city id once it is known
+        self.locations = LocationResolver()
+        self.mode = mode or settings.CACHE_MODE
+        if self.mode not in CACHE_MODES:
+            print(f"Unknown cache mode '{self.mode}', using {MODE_NETWORK}")
+            self.mode = MODE_NETWORK
+        # Outside network mode, entries are kept as last known data well past expiry
+        keep_stale = settings.OFFLINE_MAX_STALE_MINUTES if self.mode != MODE_NETWORK else 0
+        self.cache = create_cache("weather", max_stale_minutes=keep_stale, metrics=self.metrics)
+        self.forecast_cache = create_cache(
+            "forecast",
+            settings.FORECAST_CACHE_EXPIRY_MINUTES,
+            max_stale_minutes=max(settings.FORECAST_CACHE_MAX_STALE_MINUTES, keep_stale),
+            metrics=self.metrics,
+        )
+        self.base_url = base_url or settings.OPENWEATHER_BASE_URL
+        self.forecast_url = forecast_url or settings.FORECAST_BASE_URL
+        self.timeout = timeout if timeout is not None else settings.REQUEST_TIMEOUT_SECONDS
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=(
+                max_keepalive_connections
+                if max_keepalive_connections is not None
+                else settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+            ),
+            keepalive_expiry=(
+                keepalive_expiry if keepalive_expiry is not None else settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+        )
+        self.http2 = http2 if http2 is not None else settings.HTTP2_ENABLED
+        # One bucket for every endpoint: the upstream quota is per API key
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._client: Optional[httpx.AsyncClient] = None
+        # (endpoint, city, units) -> request currently in flight
+        self._inflight: Dict[Tuple[str, str, str], "asyncio.Task[Any]"] = {}
+        # In-flight request -> number of callers awaiting it
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        # Fire-and-forget refreshes, referenced here so they are not garbage collected
+        self._background_tasks: Set["asyncio.Task[Any]"] = set()
+        
+        # Instrumentation (no-ops unless METRICS_ENABLED)
+        self._upstream_requests = self.metrics.counter(
+            "weather_upstream_requests_total",
+            "Upstream HTTP attempts by status code (or timeout/error)",
+            ("endpoint", "status"),
+        )
+        self._upstream_seconds = self.metrics.histogram(
+            "weather_upstream_request_seconds", "Upstream HTTP attempt latency", ("endpoint",)
+        )
+        self._upstream_bytes = self.metrics.counter(
+            "weather_upstream_response_bytes_total", "Response body bytes received", ("endpoint",)
+        )
+        self._upstream_retries = self.metrics.counter(
+            "weather_upstream_retries_total", "Retried attempts by reason", ("endpoint", "reason")
+        )
+        self._upstream_in_flight = self.metrics.gauge(
+            "weather_upstream_requests_in_flight", "Upstream HTTP attempts in progress", ("endpoint",)
+        )
+        self._coalesced = self.metrics.counter(
+            "weather_coalesced_requests_total", "Lookups that joined a request already in flight", ("endpoint",)
+        )
+    
+    async def __aenter__(self) -> "WeatherService":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2 and _http2_available(),
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Cancel background refreshes, close the shared HTTP client and the caches."""
+        for task in list(self._background_tasks):
+            task.cancel()
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+        await self.locations.aclose()
+        self.cache.close()
+        self.forecast_cache.close()
     
-    def __init__(self):
-        self.api_key = OPENWEATHER_API_KEY
-        self.cache = WeatherCache()
+    def _spawn(self, coro: Awaitable[Any], description: str):
+        """Run ``coro`` in the background, logging instead of raising on failure."""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        
+        def _done(t: "asyncio.Task[Any]"):
+            self._background_tasks.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"{description} error: {t.exception()}")
+        
+        task.add_done_callback(_done)
+    
+    async def run_cache_sweeper(self):
+        """Periodically sweep both the weather and the forecast cache."""
+        await asyncio.gather(self.cache.run_sweeper(), self.forecast_cache.run_sweeper())
     
-    async def get_weather(self, city: str, units: str = "metric") -> Dict[str, Any]:
+    async def _single_flight(
+        self,
+        endpoint: str,
+        city: str,
+        units: str,
+        fetch: Callable[[], Awaitable[Model]],
+    ) -> Model:
+        """
+        Run ``fetch`` at most once per ``(endpoint, city, units)`` at a time.
+        
+        ``city`` is the location's cache key, so different spellings of a
+        resolved city share one request.
+        
+        Concurrent callers for the same key await the request already in
+        flight and all receive its result (or its exception). The request is
+        shielded, so one caller being cancelled does not cancel it for the rest;
+        it is cancelled once the last caller awaiting it is.
+        """
+        key = (endpoint, city.strip().lower(), units)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            
+            def _done(t: "asyncio.Task[Model]"):
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                # Mark the exception as retrieved even if every caller went away
+                if not t.cancelled():
+                    t.exception()
+            
+            task.add_done_callback(_done)
+        else:
+            self._coalesced.inc(endpoint)
+        
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                # Every caller was cancelled: nobody is left to use the result.
+                # Unlist it now so a new caller starts a fresh request rather
+                # than joining one that is being cancelled.
+                if not task.done():
+                    if self._inflight.get(key) is task:
+                        del self._inflight[key]
+                    task.cancel()
+    
+    async def _request(self, url: str, city: str, units: str) -> Dict[str, Any]:
+        """Perform a GET against an OpenWeatherMap endpoint and return the JSON body."""
+        if not self.api_key:
+            raise Exception("API key not configured. Please set OPENWEATHER_API_KEY in .env file.")
+        
+        params = {
+            **self.locations.query_params(city),
+            "appid": self.api_key,
+            "units": units,
+        }
+        
+        endpoint = "forecast" if url == self.forecast_url else "weather"
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            self._upstream_in_flight.inc(endpoint)
+            sent = time.perf_counter()
+            try:
+                response = await self._get_client().get(url, params=params)
+            except httpx.TimeoutException:
+                self._upstream_requests.inc(endpoint, "timeout")
+                reason = "timeout"
+                delay = self.retry_policy.next_delay(attempt, started)
+                if delay is None:
+                    raise Exception("Request timed out. Please check your internet connection.")
+            except httpx.RequestError as e:
+                self._upstream_requests.inc(endpoint, "error")
+                raise Exception(f"Network error: {str(e)}")
+            else:
+                self._upstream_requests.inc(endpoint, str(response.status_code))
+                self._upstream_bytes.inc(endpoint, amount=len(response.content))
+                if not self.retry_policy.should_retry(response.status_code):
+                    break
+                reason = str(response.status_code)
+                delay = self.retry_policy.next_delay(
+                    attempt, started, parse_retry_after(response.headers.get("Retry-After"))
+                )
+                if delay is None:
+                    break
+            finally:
+                self._upstream_in_flight.dec(endpoint)
+                self._upstream_seconds.observe(endpoint, value=time.perf_counter() - sent)
+            
+            self._upstream_retries.inc(endpoint, reason)
+            await asyncio.sleep(delay)
+            attempt += 1
+        
+        if response.status_code == 404:
+            raise Exception(f"City '{city}' not found. Please check the spelling.")
+        elif response.status_code == 401:
+            raise Exception(
+                "Invalid API key. Please check your OpenWeatherMap API key.\n"
+                "1. Make sure your .env file contains: OPENWEATHER_API_KEY=your_actual_key\n"
+                "2. Get a free API key at: https://openweathermap.org/api\n"
+                "3. Remove any quotes or extra spaces around the key\n"
+                "4. Restart the application after updating .env"
+            )
+        elif response.status_code == 429:
+            raise Exception("Too many requests. Please wait a moment and try again.")
+        elif response.status_code != 200:
+            raise Exception(f"API error: {response.status_code}")
+        
+        return response.json()
+    
+    async def get_weather(self, city: str, units: str = "metric") -> CurrentWeather:
         """
         Get current weather for a city.
         
+        Data is always fetched and cached in ``CANONICAL_UNITS``; other unit
+        systems are produced locally, so toggling units never hits the network.
+        
         Args:
             city: City name
             units: Temperature units ('metric' for Celsius, 'imperial' for Fahrenheit)
         
         Returns:
-            Dictionary containing weather data
+            Parsed current weather
         
         Raises:
             Exception: If API call fails
         """
-        # Check cache first
-        cache_key = f"{city}_{units}"
-        cached_data = self.cache.get(cache_key)
-        if cached_data:
-            return cached_data
-        
-        if not self.api_key:
-            raise Exception("API key not configured. Please set OPENWEATHER_API_KEY in .env file.")
+        weather, _ = await self.get_weather_with_age(city, units)
+        return weather
+    
+    async def get_weather_with_age(self, city: str, units: str = "metric") -> Tuple[CurrentWeather, float]:
+        """
+        Get current weather and its age in seconds (0 if just downloaded).
         
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": units,
-        }
+        See ``_cached_or_fetch`` for how each cache mode answers.
+        """
+        weather, age = await self._cached_or_fetch(
+            self.cache, CurrentWeather, city, self.refresh_weather, "Weather refresh"
+        )
+        return self.to_units(weather, units), age
+    
+    async def refresh_weather(self, city: str) -> CurrentWeather:
+        """Download current weather (coalesced with identical requests) and cache it."""
+        async def fetch() -> CurrentWeather:
+            data = await self._request(self.base_url, city, CANONICAL_UNITS)
+            key = self.locations.learn(city, data.get("id"))
+            weather = CurrentWeather.from_api(data)
+            # Cache the compact row rather than the raw response
+            self.cache.set(key, weather.to_row())
+            return weather
         
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(OPENWEATHER_BASE_URL, params=params)
-                
-                if response.status_code == 404:
-                    raise Exception(f"City '{city}' not found. Please check the spelling.")
-                elif response.status_code == 401:
-                    raise Exception(
-                        "Invalid API key. Please check your OpenWeatherMap API key.\n"
-                        "1. Make sure your .env file contains: OPENWEATHER_API_KEY=your_actual_key\n"
-                        "2. Get a free API key at: https://openweathermap.org/api\n"
-                        "3. Remove any quotes or extra spaces around the key\n"
-                        "4. Restart the application after updating .env"
-                    )
-                elif response.status_code != 200:
-                    raise Exception(f"API error: {response.status_code}")
-                
-                data = response.json()
-                
-                # Cache the result
-                self.cache.set(cache_key, data)
-                
-                return data
-                
-        except httpx.TimeoutException:
-            raise Exception("Request timed out. Please check your internet connection.")
-        except httpx.RequestError as e:
-            raise Exception(f"Network error: {str(e)}")
-    
-    async def get_forecast(self, city: str, units: str = "metric") -> Dict[str, Any]:
+        return await self._single_flight("weather", self.locations.cache_key(city), CANONICAL_UNITS, fetch)
+    
+    async def get_forecast(self, city: str, units: str = "metric") -> Forecast:
         """
         Get 5-day weather forecast for a city.
         
+        Forecasts are cached with their own expiry. An expired entry that is
+        still within the stale grace period is returned immediately while a
+        background task fetches a fresh copy (stale-while-revalidate).
+        
         Args:
             city: City name
             units: Temperature units ('metric' for Celsius, 'imperial' for Fahrenheit)
         
         Returns:
-            Dictionary containing forecast data
+            Parsed forecast
         
         Raises:
             Exception: If API call fails
         """
-        if not self.api_key:
-            raise Exception("API key not configured. Please set OPENWEATHER_API_KEY in .env file.")
+        forecast, _ = await self.get_forecast_with_age(city, units)
+        return forecast
+    
+    async def get_forecast_with_age(self, city: str, units: str = "metric") -> Tuple[Forecast, float]:
+        """Get a 5-day forecast and its age in seconds; see ``get_weather_with_age``."""
+        forecast, age = await self._cached_or_fetch(
+            self.forecast_cache, Forecast, city, self.refresh_forecast, "Forecast refresh"
+        )
+        return self.to_units(forecast, units), age
+    
+    async def _cached_or_fetch(
+        self,
+        cache: WeatherCache,
+        model: Type[Model],
+        city: str,
+        refresh: Callable[[str], Awaitable[Model]],
+        description: str,
+    ) -> Tuple[Model, float]:
+        """
+        Answer from ``cache`` when possible, otherwise download with ``refresh``.
         
-        params = {
-            "q": city,
-            "appid": self.api_key,
-            "units": units,
-        }
+        A fresh entry is returned as is. A stale entry (kept for the cache's
+        grace period, or for ``OFFLINE_MAX_STALE_MINUTES`` outside network
+        mode) is returned immediately while ``refresh`` runs in the
+        background. Only a miss waits on the network, and in cache-only mode
+        a miss raises instead.
         
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(FORECAST_BASE_URL, params=params)
-                
-                if response.status_code == 404:
-                    raise Exception(f"City '{city}' not found. Please check the spelling.")
-                elif response.status_code == 401:
-                    raise Exception(
-                        "Invalid API key. Please check your OpenWeatherMap API key.\n"
-                        "1. Make sure your .env file contains: OPENWEATHER_API_KEY=your_actual_key\n"
-                        "2. Get a free API key at: https://openweathermap.org/api\n"
-                        "3. Remove any quotes or extra spaces around the key\n"
-                        "4. Restart the application after updating .env"
-                    )
-                elif response.status_code != 200:
-                    raise Exception(f"API error: {response.status_code}")
-                
-                return response.json()
-                
-        except httpx.TimeoutException:
-            raise Exception("Request timed out. Please check your internet connection.")
-        except httpx.RequestError as e:
-            raise Exception(f"Network error: {str(e)}")
+        Returns:
+            Tuple of (canonical data, age in seconds)
+        """
+        cached = cache.get_with_age(self.locations.cache_key(city))
+        if cached is not None:
+            row, age = cached
+            data = _from_row(model, row)
+            if data is not None:
+                if age >= cache.expiry_seconds and self.mode != MODE_CACHE_ONLY:
+                    self._spawn(refresh(city), description)
+                return data, age
+        
+        if self.mode == MODE_CACHE_ONLY:
+            raise Exception(f"No saved data for '{city}'. Connect to the internet and search again.")
+        return await refresh(city), 0.0
+    
+    async def refresh_forecast(self, city: str) -> Forecast:
+        """Download a forecast (coalesced with identical requests) and cache it."""
+        async def fetch() -> Forecast:
+            data = await self._request(self.forecast_url, city, CANONICAL_UNITS)
+            key = self.locations.learn(city, data.get("city", {}).get("id"))
+            forecast = Forecast.from_api(data)
+            self.forecast_cache.set(key, forecast.to_row())
+            return forecast
+        
+        return await self._single_flight("forecast", self.locations.cache_key(city), CANONICAL_UNITS, fetch)
+    
+    async def get_weather_many(
+        self,
+        cities: Iterable[str],
+        units: str = "metric",
+        concurrency: Optional[int] = None,
+    ) -> Tuple[Dict[str, CurrentWeather], Dict[str, Exception]]:
+        """
+        Get current weather for many cities at once.
+        
+        Cached cities are answered first; the rest are fetched concurrently,
+        at most ``concurrency`` at a time. A failing city does not abort the
+        others.
+        
+        Args:
+            cities: City names (duplicates are fetched once)
+            units: Temperature units ('metric' for Celsius, 'imperial' for Fahrenheit)
+            concurrency: Maximum requests in flight (defaults to BATCH_MAX_CONCURRENCY)
+        
+        Returns:
+            Tuple of (results by city, exceptions by city)
+        """
+        return await self._get_many(self.get_weather, self.cache, CurrentWeather, cities, units, concurrency)
+    
+    async def get_forecast_many(
+        self,
+        cities: Iterable[str],
+        units: str = "metric",
+        concurrency: Optional[int] = None,
+    ) -> Tuple[Dict[str, Forecast], Dict[str, Exception]]:
+        """Get 5-day forecasts for many cities at once; see ``get_weather_many``."""
+        return await self._get_many(self.get_forecast, self.forecast_cache, Forecast, cities, units, concurrency)
+    
+    async def _get_many(
+        self,
+        fetch: Callable[[str, str], Awaitable[Model]],
+        cache: WeatherCache,
+        model: Type[Model],
+        cities: Iterable[str],
+        units: str,
+        concurrency: Optional[int],
+    ) -> Tuple[Dict[str, Model], Dict[str, Exception]]:
+        """Fan ``fetch`` out over ``cities`` under a semaphore, serving cache hits first."""
+        unique = list(dict.fromkeys(cities))
+        results: Dict[str, Model] = {}
+        errors: Dict[str, Exception] = {}
+        
+        pending = []
+        for city in unique:
+            # Misses are counted once, by fetch; peek first so they are not
+            # counted here as well
+            key = self.locations.cache_key(city)
+            peeked = cache.peek(key)
+            cached = None
+            if peeked is not None and peeked[1] < cache.expiry_seconds:
+                cached = _from_row(model, cache.get(key))
+            if cached is not None:
+                results[city] = self.to_units(cached, units)
+            else:
+                pending.append(city)
+        
+        semaphore = asyncio.Semaphore(concurrency or settings.BATCH_MAX_CONCURRENCY)
+        
+        async def fetch_one(city: str):
+            async with semaphore:
+                try:
+                    results[city] = await fetch(city, units)
+                except Exception as e:
+                    errors[city] = e
+        
+        await asyncio.gather(*(fetch_one(city) for city in pending))
+        return {city: results[city] for city in unique if city in results}, errors
     
     def convert_temperature(self, temp: float, from_unit: str, to_unit: str) -> float:
         """Convert temperature between Celsius and Fahrenheit."""
@@ -176,4 +939,41 @@ class WeatherService:
             return (temp - 32) * 5/9
         
         return temp
-
+    
+    def convert_speed(self, speed: float, from_unit: str, to_unit: str) -> float:
+        """Convert wind speed between m/s (metric) and mph (imperial)."""
+        if from_unit == to_unit:
+            return speed
+        
+        if from_unit == "metric" and to_unit == "imperial":
+            return speed * MPH_PER_METRE_PER_SECOND
+        elif from_unit == "imperial" and to_unit == "metric":
+            return speed / MPH_PER_METRE_PER_SECOND
+        
+        return speed
+    
+    def _convert_reading(
+        self, reading: Union[CurrentWeather, ForecastSlot], units: str
+    ) -> Union[CurrentWeather, ForecastSlot]:
+        """Copy one weather reading (current or a forecast slot) with converted values."""
+        temperatures = {
+            field: self.convert_temperature(getattr(reading, field), CANONICAL_UNITS, units)
+            for field in TEMPERATURE_FIELDS
+        }
+        return replace(
+            reading,
+            wind_speed=self.convert_speed(reading.wind_speed, CANONICAL_UNITS, units),
+            **temperatures,
+        )
+    
+    def to_units(self, data: Model, units: str) -> Model:
+        """
+        Convert canonical weather or forecast data to the requested unit system.
+        
+        The cached data is never modified; a converted copy is returned instead.
+        """
+        if units == CANONICAL_UNITS:
+            return data
+        if isinstance(data, Forecast):
+            return replace(data, slots=[self._convert_reading(slot, units) for slot in data.slots])
+        return self._convert_reading(data, units)
@@ -0,0 +1,310 @@
+"""Retained Flet controls for the current-weather and forecast panels and search suggestions.
+
+Each view builds its control tree once. A refresh only assigns new property
+values (text, image src, visibility) to the existing controls, so Flet sends
+a small patch of changed properties instead of re-serializing the panel.
+"""
+from typing import Callable, List
+
+import flet as ft
+
+from models import CurrentWeather, DailySummary
+
+ICON_URL = "https://openweathermap.org/img/wn/{}@2x.png"
+
+
+def unit_labels(units: str):
+    """Temperature and wind-speed suffixes for a unit system."""
+    if units == "imperial":
+        return "°F", "mph"
+    return "°C", "m/s"
+
+
+def format_age(seconds: float) -> str:
+    """Human-readable age of cached data, e.g. "5 min ago"."""
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return "just now"
+    if minutes < 60:
+        return f"{minutes} min ago"
+    hours = minutes // 60
+    if hours < 24:
+        return f"{hours} h ago"
+    days = hours // 24
+    return f"{days} day{'s' if days != 1 else ''} ago"
+
+
+class CurrentWeatherView:
+    """Current-weather panel: placeholder, loading indicator and weather details."""
+
+    def __init__(self):
+        self.placeholder = ft.Text(
+            "Search for a city to see weather information",
+            size=18,
+            color="#757575",  # Grey 600
+            text_align=ft.TextAlign.CENTER,
+        )
+
+        self.loading = ft.Column(
+            controls=[
+                ft.ProgressRing(),
+                ft.Text("Loading weather data...", size=16),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=10,
+            visible=False,
+        )
+
+        self.city_text = ft.Text(
+            "",
+            size=24,
+            weight=ft.FontWeight.BOLD,
+            color="#0D47A1",  # Blue 900
+        )
+        self.icon = ft.Image(src=ICON_URL.format("01d"), width=100, height=100)
+        self.temp_text = ft.Text(
+            "",
+            size=48,
+            weight=ft.FontWeight.BOLD,
+            color="#1976D2",  # Blue 700
+        )
+        self.description_text = ft.Text(
+            "",
+            size=20,
+            color="#616161",  # Grey 700
+        )
+        self.feels_like_text = self._value_text()
+        self.humidity_text = self._value_text()
+        self.wind_text = self._value_text()
+        self.pressure_text = self._value_text()
+        # Shown only when the data came from cache and is not current
+        self.updated_text = ft.Text(
+            "",
+            size=12,
+            italic=True,
+            color="#757575",  # Grey 600
+            visible=False,
+        )
+
+        self.details = ft.Column(
+            controls=[
+                # City name
+                self.city_text,
+
+                # Weather icon and temperature
+                ft.Row(
+                    controls=[self.icon, self.temp_text],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                    spacing=10,
+                ),
+
+                # Description
+                self.description_text,
+
+                # Details row
+                ft.Container(
+                    content=ft.Row(
+                        controls=[
+                            self._detail("Feels Like", self.feels_like_text),
+                            self._detail("Humidity", self.humidity_text),
+                            self._detail("Wind Speed", self.wind_text),
+                            self._detail("Pressure", self.pressure_text),
+                        ],
+                        alignment=ft.MainAxisAlignment.SPACE_EVENLY,
+                        spacing=20,
+                    ),
+                    padding=ft.padding.only(top=20),
+                ),
+
+                # Age of cached data
+                self.updated_text,
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=15,
+            visible=False,
+        )
+
+        self.control = ft.Column(
+            controls=[self.placeholder, self.loading, self.details],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=10,
+        )
+
+    @staticmethod
+    def _value_text() -> ft.Text:
+        return ft.Text("", size=18, weight=ft.FontWeight.W_500)
+
+    @staticmethod
+    def _detail(label: str, value: ft.Text) -> ft.Column:
+        return ft.Column(
+            controls=[
+                ft.Text(
+                    label,
+                    size=12,
+                    color="#757575",  # Grey 600
+                ),
+                value,
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=5,
+        )
+
+    def _show_only(self, control: ft.Control):
+        for child in (self.placeholder, self.loading, self.details):
+            child.visible = child is control
+
+    def show_loading(self):
+        """Switch to the loading indicator."""
+        self._show_only(self.loading)
+
+    def show(self, weather: CurrentWeather, units: str, age: float = 0.0):
+        """Fill the details from current weather and make them visible.
+
+        ``age`` is how old the data is in seconds; from one minute on it is
+        shown below the details.
+        """
+        unit_symbol, wind_unit = unit_labels(units)
+
+        self.city_text.value = f"{weather.city}, {weather.country}"
+        self.icon.src = ICON_URL.format(weather.icon)
+        self.temp_text.value = f"{weather.temp:.1f}{unit_symbol}"
+        self.description_text.value = weather.description.title()
+        self.feels_like_text.value = f"{weather.feels_like:.1f}{unit_symbol}"
+        self.humidity_text.value = f"{weather.humidity}%"
+        self.wind_text.value = f"{weather.wind_speed:.1f} {wind_unit}"
+        self.pressure_text.value = f"{weather.pressure} hPa"
+        self.updated_text.value = f"Updated {format_age(age)}"
+        self.updated_text.visible = age >= 60
+        self._show_only(self.details)
+
+
+class ForecastDayCard:
+    """One day of the forecast."""
+
+    def __init__(self):
+        self.day_text = ft.Text(
+            "",
+            size=16,
+            weight=ft.FontWeight.BOLD,
+            color="#0D47A1",  # Blue 900
+        )
+        self.date_text = ft.Text(
+            "",
+            size=12,
+            color="#757575",  # Grey 600
+        )
+        self.icon = ft.Image(src=ICON_URL.format("01d"), width=60, height=60)
+        self.temp_text = ft.Text("", size=24, weight=ft.FontWeight.BOLD)
+        self.range_text = ft.Text(
+            "",
+            size=12,
+            color="#757575",  # Grey 600
+        )
+        self.description_text = ft.Text(
+            "",
+            size=12,
+            color="#616161",  # Grey 700
+            text_align=ft.TextAlign.CENTER,
+        )
+        self.humidity_text = ft.Text("", size=11)
+        self.wind_text = ft.Text("", size=11)
+
+        self.control = ft.Card(
+            content=ft.Container(
+                content=ft.Column(
+                    controls=[
+                        # Date
+                        self.day_text,
+                        self.date_text,
+
+                        # Icon and temp
+                        ft.Row(
+                            controls=[
+                                self.icon,
+                                ft.Column(
+                                    controls=[self.temp_text, self.range_text],
+                                    spacing=2,
+                                ),
+                            ],
+                            alignment=ft.MainAxisAlignment.CENTER,
+                        ),
+
+                        # Description
+                        self.description_text,
+
+                        # Details
+                        ft.Row(
+                            controls=[self.humidity_text, self.wind_text],
+                            alignment=ft.MainAxisAlignment.CENTER,
+                            spacing=10,
+                        ),
+                    ],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    spacing=8,
+                ),
+                padding=15,
+            ),
+            elevation=2,
+            visible=False,
+        )
+
+    def show(self, day: DailySummary, units: str):
+        """Fill the card from one ``forecast_processing.daily_summaries`` entry."""
+        unit_symbol, wind_unit = unit_labels(units)
+        self.day_text.value = day.date.strftime("%A")
+        self.date_text.value = day.date.strftime("%b %d")
+        self.icon.src = ICON_URL.format(day.icon)
+        self.temp_text.value = f"{day.temp:.0f}{unit_symbol}"
+        self.range_text.value = f"{day.temp_min:.0f}° / {day.temp_max:.0f}°"
+        self.description_text.value = day.description.title()
+        self.humidity_text.value = f"💧 {day.humidity}%"
+        self.wind_text.value = f"💨 {day.wind_speed:.1f} {wind_unit}"
+        self.control.visible = True
+
+
+class ForecastView:
+    """Fixed set of day cards; days beyond the data are hidden, not removed."""
+
+    def __init__(self, days: int = 5):
+        self.cards = [ForecastDayCard() for _ in range(days)]
+        self.control = ft.Column(
+            controls=[card.control for card in self.cards],
+            spacing=10,
+        )
+
+    def show(self, days: List[DailySummary], units: str):
+        for i, card in enumerate(self.cards):
+            if i < len(days):
+                card.show(days[i], units)
+            else:
+                card.control.visible = False
+
+
+class SuggestionList:
+    """Fixed set of suggestion buttons below the search box; unused ones are hidden."""
+
+    def __init__(self, on_select: Callable[[str], None], size: int = 6):
+        self.on_select = on_select
+        self.buttons = [
+            ft.TextButton(text="", icon="history", visible=False, on_click=self._clicked)
+            for _ in range(size)
+        ]
+        self.control = ft.Column(controls=self.buttons, spacing=0, visible=False)
+
+    def _clicked(self, e):
+        self.on_select(e.control.data)
+
+    def show(self, cities: List[str], recent: int = 0):
+        """Show ``cities``; the first ``recent`` of them get a history icon."""
+        for i, button in enumerate(self.buttons):
+            if i < len(cities):
+                button.text = cities[i]
+                button.data = cities[i]
+                button.icon = "history" if i < recent else "location_city"
+                button.visible = True
+            else:
+                button.visible = False
+        self.control.visible = bool(cities)
+
+    def hide(self):
+        self.control.visible = False
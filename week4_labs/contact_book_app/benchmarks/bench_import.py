@@ -0,0 +1,86 @@
+"""Benchmark: bulk import and export of contacts, CSV and vCard.
+
+Writes a generated contact file of each size, imports it into an empty
+database with ``import_contacts``, imports it again (every row a
+duplicate), then exports the book back out::
+
+    python benchmarks/bench_import.py --sizes 10000,100000,1000000
+
+"per-row" is the original path, ``insert_contact_db`` (one commit per
+contact) for each row; it is only measured up to ``--per-row-max`` contacts.
+"""
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from bench_search import generate_contacts  # noqa: E402
+from database import init_db, insert_contact_db  # noqa: E402
+from import_export import export_contacts, format_vcard, import_contacts  # noqa: E402
+
+
+def write_file(path, count):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.suffix == ".vcf":
+            for i, contact in enumerate(generate_contacts(count)):
+                f.write(format_vcard((i, *contact)))
+        else:
+            writer = csv.writer(f)
+            writer.writerow(["name", "phone", "email"])
+            writer.writerows(generate_contacts(count))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def per_row(db_conn, path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for name, phone, email in reader:
+            insert_contact_db(db_conn, name, phone, email)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated contact counts")
+    parser.add_argument("--formats", default="csv,vcf", help="comma-separated file formats")
+    parser.add_argument("--per-row-max", type=int, default=10000, help="largest size for the per-row insert")
+    args = parser.parse_args()
+
+    print(f"{'contacts':>10}{'format':>8}{'MB':>7}{'per-row (s)':>13}{'import (s)':>12}"
+          f"{'rows/s':>10}{'reimport (s)':>14}{'export (s)':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            for fmt in (f.strip() for f in args.formats.split(",") if f.strip()):
+                source = Path(tmp) / f"contacts_{size}.{fmt}"
+                write_file(source, size)
+
+                slow = "-"
+                if fmt == "csv" and size <= args.per_row_max:
+                    db_conn = init_db(str(Path(tmp) / f"per_row_{size}.db"))
+                    slow = f"{timed(per_row, db_conn, source)[0]:.1f}"
+                    db_conn.close()
+
+                db_conn = init_db(str(Path(tmp) / f"bulk_{size}_{fmt}.db"))
+                seconds, stats = timed(import_contacts, db_conn, source)
+                assert stats["imported"] == size, stats
+                again, stats = timed(import_contacts, db_conn, source)
+                assert stats["duplicates"] == size, stats
+                export, written = timed(export_contacts, db_conn, Path(tmp) / f"export_{size}.{fmt}")
+                assert written == size
+                db_conn.close()
+
+                print(f"{size:>10}{fmt:>8}{source.stat().st_size / 2**20:>7.0f}{slow:>13}{seconds:>12.1f}"
+                      f"{size / seconds:>10.0f}{again:>14.1f}{export:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
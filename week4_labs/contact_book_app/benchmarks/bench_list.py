@@ -0,0 +1,168 @@
+"""Benchmark: controls and bytes sent to the Flet client by the contact list.
+
+Drives ``load_contacts``, ``on_contacts_scroll`` and adding/deleting a
+contact on a real ``ft.Page``
+whose connection serializes every command batch like the Flet server does,
+but counts the bytes instead of sending them::
+
+    python benchmarks/bench_list.py --sizes 1000,10000,100000
+
+"full list" is the original behaviour, one card per contact in a single
+update; it is only measured up to ``--full-max`` contacts.
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import flet as ft  # noqa: E402
+from flet.core.local_connection import LocalConnection  # noqa: E402
+from flet.core.protocol import (  # noqa: E402
+    ClientActions,
+    ClientMessage,
+    Command,
+    CommandEncoder,
+    PageCommandsBatchResponsePayload,
+)
+
+from app_logic import (  # noqa: E402
+    CARD_EXTENT,
+    fill_contact_card,
+    insert_contact_card,
+    load_contacts,
+    make_contact_card,
+    on_contacts_scroll,
+    remove_contact_card,
+)
+from bench_search import generate_contacts  # noqa: E402
+from database import delete_contact_db, get_all_contacts_db, init_db, insert_contact_db  # noqa: E402
+
+
+class RecordingConnection(LocalConnection):
+    """Flet connection that measures outgoing messages instead of sending them."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent_bytes = 0
+
+    def _record(self, message: ClientMessage):
+        self.sent_bytes += len(json.dumps(message, cls=CommandEncoder, separators=(",", ":")))
+
+    def send_command(self, session_id: str, command: Command):
+        result, message = self._process_command(command)
+        if message:
+            self._record(message)
+        return PageCommandsBatchResponsePayload(results=[result] if result else [], error="")
+
+    def send_commands(self, session_id: str, commands: List[Command]):
+        results = []
+        messages = []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ["add", "get"]:
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            self._record(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages))
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def count_controls(control):
+    return 1 + sum(count_controls(child) for child in control._get_children())
+
+
+def new_page():
+    conn = RecordingConnection()
+    page = ft.Page(conn, "benchmark", None)
+    list_view = ft.ListView(expand=True, item_extent=CARD_EXTENT)
+    page.add(list_view)
+    return conn, page, list_view
+
+
+def bench_windowed(db_conn, scrolls):
+    conn, page, list_view = new_page()
+    before = conn.sent_bytes
+    load_contacts(db_conn, list_view)
+    initial = conn.sent_bytes - before
+
+    # Scroll to the bottom of the window again and again: each event pages in more rows
+    sizes, timings = [], []
+    for _ in range(scrolls):
+        extent = len(list_view.controls) * CARD_EXTENT
+        event = SimpleNamespace(pixels=extent - 600, min_scroll_extent=0, max_scroll_extent=extent - 600)
+        before = conn.sent_bytes
+        start = time.perf_counter()
+        on_contacts_scroll(event, db_conn, list_view)
+        timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(conn.sent_bytes - before)
+    return initial, count_controls(list_view), statistics.mean(sizes), statistics.median(timings)
+
+
+def bench_add_delete(db_conn, repeats):
+    """Add a contact that sorts into the visible window, then delete it."""
+    conn, page, list_view = new_page()
+    load_contacts(db_conn, list_view)
+    add_sizes, delete_sizes, timings = [], [], []
+    for i in range(repeats):
+        contact = ("Aaron Abad", "09170000000", f"aaron{i}@example.ph")
+        before = conn.sent_bytes
+        start = time.perf_counter()
+        contact_id = insert_contact_db(db_conn, *contact)
+        insert_contact_card(db_conn, list_view, (contact_id, *contact))
+        middle = conn.sent_bytes
+        delete_contact_db(db_conn, contact_id)
+        remove_contact_card(db_conn, list_view, contact_id)
+        timings.append((time.perf_counter() - start) * 1000 / 2)
+        add_sizes.append(middle - before)
+        delete_sizes.append(conn.sent_bytes - middle)
+    return statistics.mean(add_sizes), statistics.mean(delete_sizes), statistics.median(timings)
+
+
+def bench_full_list(db_conn):
+    conn, page, list_view = new_page()
+    before = conn.sent_bytes
+    for contact in get_all_contacts_db(db_conn):
+        card = make_contact_card(db_conn, list_view)
+        fill_contact_card(card, contact)
+        list_view.controls.append(card)
+    list_view.update()
+    return conn.sent_bytes - before, count_controls(list_view)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated contact counts")
+    parser.add_argument("--scrolls", type=int, default=20, help="page loads to measure per size")
+    parser.add_argument("--full-max", type=int, default=10000, help="largest size for the full list")
+    args = parser.parse_args()
+
+    print(f"{'contacts':>10}{'full KB':>10}{'full ctrls':>12}{'window KB':>11}{'max ctrls':>14}"
+          f"{'KB/scroll':>11}{'ms/scroll':>11}{'B/add':>8}{'B/delete':>10}{'ms/op':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            db_conn = init_db(str(Path(tmp) / f"contacts_{size}.db"))
+            with db_conn:
+                db_conn.executemany(
+                    "INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)", generate_contacts(size)
+                )
+            full_kb, full_controls = "-", "-"
+            if size <= args.full_max:
+                full_bytes, full_controls = bench_full_list(db_conn)
+                full_kb = f"{full_bytes / 1024:.0f}"
+            initial, controls, per_scroll, scroll_ms = bench_windowed(db_conn, args.scrolls)
+            add_bytes, delete_bytes, op_ms = bench_add_delete(db_conn, args.scrolls)
+            print(f"{size:>10}{full_kb:>10}{full_controls:>12}{initial / 1024:>11.0f}{controls:>14}"
+                  f"{per_scroll / 1024:>11.1f}{scroll_ms:>11.2f}{add_bytes:>8.0f}{delete_bytes:>10.0f}{op_ms:>8.2f}")
+            db_conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark: keystroke search latency, FTS5 index vs. the original LIKE scan.
+
+Builds contact databases of increasing size in a temporary directory and
+replays typing a few queries one character at a time, as the search box's
+on_change does::
+
+    python benchmarks/bench_search.py --sizes 10000,100000,1000000
+
+"LIKE" is the original query (``name LIKE '%term%'`` over the whole table);
+"FTS5" is ``get_all_contacts_db`` with the full-text index and its LIMIT.
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from database import get_all_contacts_db, init_db  # noqa: E402
+
+FIRST_NAMES = [
+    "Maria", "Jose", "Juan", "Ana", "Mark", "John", "Angel", "Joy", "Michael", "Grace",
+    "Carlo", "Patricia", "Paolo", "Andrea", "Miguel", "Sofia", "Rafael", "Isabel", "Daniel", "Camille",
+]
+LAST_NAMES = [
+    "Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Ramos", "Flores", "Gonzales",
+    "Villanueva", "Aquino", "Castillo", "Rivera", "Navarro", "Dela Cruz", "Fernandez", "Lopez", "Morales", "Perez",
+]
+DOMAINS = ["gmail.com", "yahoo.com", "outlook.com", "example.ph"]
+
+# Each query is replayed one keystroke at a time: "m", "ma", "mar", ...
+QUERIES = ["maria santos", "villanueva", "0917", "gmail"]
+
+
+def generate_contacts(count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        phone = "09" + "".join(rng.choice("0123456789") for _ in range(9))
+        email = f"{first}.{last.replace(' ', '')}{i}@{rng.choice(DOMAINS)}".lower()
+        yield f"{first} {last}", phone, email
+
+
+def like_search(conn, term):
+    # The query get_all_contacts_db ran before the FTS5 index
+    return conn.execute("SELECT * FROM contacts WHERE name LIKE ?", ("%" + term + "%",)).fetchall()
+
+
+def time_keystrokes(search, conn):
+    """Per-keystroke latencies in ms over every prefix of every query."""
+    timings = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            search(conn, query[:end])
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated contact counts")
+    args = parser.parse_args()
+
+    print(f"{'contacts':>10}{'build (s)':>11}{'LIKE p50':>10}{'LIKE max':>10}"
+          f"{'FTS5 p50':>10}{'FTS5 max':>10}{'speedup':>9}   (ms per keystroke)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            conn = init_db(str(Path(tmp) / f"contacts_{size}.db"))
+            start = time.perf_counter()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)", generate_contacts(size)
+                )
+            build = time.perf_counter() - start
+
+            like = time_keystrokes(like_search, conn)
+            fts = time_keystrokes(get_all_contacts_db, conn)
+            like_p50, fts_p50 = statistics.median(like), statistics.median(fts)
+            print(f"{size:>10}{build:>11.1f}{like_p50:>10.2f}{max(like):>10.2f}"
+                  f"{fts_p50:>10.2f}{max(fts):>10.2f}{like_p50 / fts_p50:>8.0f}x")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
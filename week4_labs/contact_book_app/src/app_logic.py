@@ -1,5 +1,19 @@
+import asyncio
+import csv
+import sqlite3
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
 import flet as ft
-from database import insert_contact_db, get_all_contacts_db, delete_contact_db
+from database import (
+    PAGE_SIZE,
+    insert_contact_db,
+    get_all_contacts_db,
+    get_contacts_page_db,
+    delete_contact_db,
+    open_read_connection,
+)
+from import_export import export_contacts, import_contacts
 
 # Robust snackbar helper supporting multiple Flet API variants
 def show_snack(page: ft.Page, message: str):
@@ -29,7 +43,7 @@ def add_contact(name, phone, email, db_conn, contacts_list_view, name_ref, phone
         name_ref.current.update()
         return
 
-    insert_contact_db(db_conn, name, phone, email)
+    contact_id = insert_contact_db(db_conn, name, phone, email)
     name_ref.current.value = ""
     phone_ref.current.value = ""
     email_ref.current.value = ""
@@ -42,58 +56,295 @@ def add_contact(name, phone, email, db_conn, contacts_list_view, name_ref, phone
     if email_ref.current:
         email_ref.current.update()
 
-    load_contacts(db_conn, contacts_list_view)
+    insert_contact_card(db_conn, contacts_list_view, (contact_id, name, phone, email))
 
     # Feedback to user
     page = page or getattr(contacts_list_view, "page", None)
     show_snack(page, "Contact added successfully")
 
-# Display contacts
-def load_contacts(db_conn, contacts_list_view, search_term=""):
-    contacts = get_all_contacts_db(db_conn, search_term)
-    contacts_list_view.controls.clear()
-
-    for contact in contacts:
-        contact_id, name, phone, email = contact
-
-        # define click handler explicitly to avoid lambda capture edge cases
-        def on_delete_click(e, cid=contact_id):
-            # quick feedback to verify click handler is firing
-            page = getattr(contacts_list_view, "page", None) or getattr(e, "page", None)
-            if page is not None:
-                page.snack_bar = ft.SnackBar(ft.Text("Preparing delete..."), open=True)
-                page.update()
-            confirm_delete(db_conn, cid, contacts_list_view)
-
-        card = ft.Card(
-            content=ft.Container(
-                content=ft.Column(
+# The list is windowed: at most WINDOW_SIZE rows exist as cards at any time,
+# and scrolling near either end of the window fetches the next page and
+# slides the window along. Cards are recycled: sliding the window rewrites
+# the text of existing cards instead of building new ones, so memory and the
+# size of each update stay flat however many contacts there are.
+WINDOW_SIZE = PAGE_SIZE * 3
+# Fixed height of one card (ListView.item_extent); needed to keep the
+# viewport on the same contacts when rows are dropped from the window
+CARD_EXTENT = 170
+# Fetch the next page once the viewport is this many cards from the window's edge
+PREFETCH_CARDS = 6
+
+# Per-list state, kept on the ListView itself
+def list_state(contacts_list_view):
+    if not isinstance(contacts_list_view.data, dict):
+        contacts_list_view.data = {
+            "rows": [],          # rows in the window, in list order
+            "cards": [],         # cards[i] shows rows[i]
+            "by_id": {},         # contact id -> its card, for rows in the window
+            "pool": [],          # cards not in use, for reuse
+            "search": "",
+            "results": [],       # ranked search results (empty when not searching)
+            "more_before": False,
+            "more_after": False,
+            "search_seq": 0,     # bumped by every keystroke; only the latest may render
+            "search_task": None,
+            "running_seq": None,  # search whose query is executing right now
+        }
+    return contacts_list_view.data
+
+# Build an empty card; fill_contact_card puts a contact in it
+def make_contact_card(db_conn, contacts_list_view):
+    name_text = ft.Text(weight="bold", size=16)
+    phone_text = ft.Text()
+    email_text = ft.Text()
+
+    card = ft.Card(elevation=2, margin=ft.margin.only(bottom=10))
+
+    # define click handler explicitly; the card is reused, so read its id on click
+    def on_delete_click(e):
+        # quick feedback to verify click handler is firing
+        page = getattr(contacts_list_view, "page", None) or getattr(e, "page", None)
+        if page is not None:
+            page.snack_bar = ft.SnackBar(ft.Text("Preparing delete..."), open=True)
+            page.update()
+        confirm_delete(db_conn, card.data["id"], contacts_list_view)
+
+    card.content = ft.Container(
+        content=ft.Column(
+            [
+                name_text,
+                ft.Row([ft.Icon(ft.Icons.PHONE), phone_text]),
+                ft.Row([ft.Icon(ft.Icons.EMAIL), email_text]),
+                ft.Row(
                     [
-                        ft.Text(name, weight="bold", size=16),
-                        ft.Row([ft.Icon(ft.Icons.PHONE), ft.Text(phone or "—")]),
-                        ft.Row([ft.Icon(ft.Icons.EMAIL), ft.Text(email or "—")]),
-                        ft.Row(
-                            [
-                                ft.ElevatedButton(
-                                    "Delete",
-                                    bgcolor="red",
-                                    color="white",
-                                    on_click=on_delete_click,
-                                )
-                            ],
-                            alignment=ft.MainAxisAlignment.START,
-                        ),
+                        ft.ElevatedButton(
+                            "Delete",
+                            bgcolor="red",
+                            color="white",
+                            on_click=on_delete_click,
+                        )
                     ],
-                    spacing=5,
+                    alignment=ft.MainAxisAlignment.START,
                 ),
-                padding=15,
-            ),
-            elevation=2,
+            ],
+            spacing=5,
+        ),
+        padding=15,
+    )
+    card.data = {"id": None, "texts": (name_text, phone_text, email_text)}
+    return card
+
+def fill_contact_card(card, contact):
+    contact_id, name, phone, email = contact
+    name_text, phone_text, email_text = card.data["texts"]
+    card.data["id"] = contact_id
+    name_text.value = name
+    phone_text.value = phone or "—"
+    email_text.value = email or "—"
+
+# Put the window's rows into pooled cards. The caller sends the update, so a
+# slide and the scroll correction that goes with it reach the client together.
+def render_window(db_conn, contacts_list_view):
+    state = list_state(contacts_list_view)
+    rows, cards, pool = state["rows"], state["cards"], state["pool"]
+    while len(cards) < len(rows):
+        cards.append(pool.pop() if pool else make_contact_card(db_conn, contacts_list_view))
+    while len(cards) > len(rows):
+        pool.append(cards.pop())
+    for card, contact in zip(cards, rows):
+        fill_contact_card(card, contact)
+    state["by_id"] = {contact[0]: card for card, contact in zip(cards, rows)}
+    # Same card objects in the same order: Flet only sends the changed texts
+    contacts_list_view.controls[:] = cards
+
+# Sort key of the list: SQLite's NOCASE collation folds ASCII letters only
+_NOCASE = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def sort_key(contact):
+    return contact[1].translate(_NOCASE), contact[0]
+
+# A contact was added: put one card at its sorted place in the window, so
+# the update carries just that card. Rows that sort outside the loaded
+# window show up when that part of the list is paged in.
+def insert_contact_card(db_conn, contacts_list_view, contact):
+    state = list_state(contacts_list_view)
+    if state["search"]:
+        # Whether it matches is up to the search index; rerun the search
+        start_search(db_conn, contacts_list_view, state["search"])
+        return
+    rows, cards = state["rows"], state["cards"]
+    i = bisect_right([sort_key(row) for row in rows], sort_key(contact))
+    if (i == 0 and state["more_before"]) or (i == len(rows) and state["more_after"]):
+        return
+
+    card = state["pool"].pop() if state["pool"] else make_contact_card(db_conn, contacts_list_view)
+    fill_contact_card(card, contact)
+    rows.insert(i, contact)
+    cards.insert(i, card)
+    state["by_id"][contact[0]] = card
+    # Keep the window at its size; the dropped row is paged in again on scroll
+    if len(rows) > WINDOW_SIZE:
+        dropped = rows.pop()
+        state["pool"].append(cards.pop())
+        del state["by_id"][dropped[0]]
+        state["more_after"] = True
+    contacts_list_view.controls[:] = cards
+    if contacts_list_view.page is not None:
+        contacts_list_view.update()
+
+# A contact was deleted: remove just its card
+def remove_contact_card(db_conn, contacts_list_view, contact_id):
+    state = list_state(contacts_list_view)
+    card = state["by_id"].pop(contact_id, None)
+    if card is None:
+        return
+    i = state["cards"].index(card)
+    contact = state["rows"].pop(i)
+    state["cards"].pop(i)
+    state["pool"].append(card)
+    if contact in state["results"]:
+        state["results"].remove(contact)
+    contacts_list_view.controls[:] = state["cards"]
+    if contacts_list_view.page is not None:
+        contacts_list_view.update()
+    # Window emptied while more rows exist: load them instead of an empty list
+    if not state["rows"] and (state["more_before"] or state["more_after"]):
+        load_contacts(db_conn, contacts_list_view, state["search"])
+
+# The page of rows after (or before) the given row, and whether more follow.
+# The full list pages through SQLite by (name, id); search results are
+# already in memory, in rank order.
+def fetch_page(db_conn, state, after=None, before=None):
+    if state["search"]:
+        results = state["results"]
+        if after is not None:
+            start = results.index(after) + 1
+            return results[start:start + PAGE_SIZE], start + PAGE_SIZE < len(results)
+        end = results.index(before)
+        return results[max(end - PAGE_SIZE, 0):end], end > PAGE_SIZE
+
+    # One extra row tells whether another page follows
+    rows = get_contacts_page_db(
+        db_conn,
+        after=(after[1], after[0]) if after is not None else None,
+        before=(before[1], before[0]) if before is not None else None,
+        limit=PAGE_SIZE + 1,
+    )
+    more = len(rows) > PAGE_SIZE
+    if more:
+        rows = rows[1:] if before is not None else rows[:PAGE_SIZE]
+    return rows, more
+
+# Display contacts (search results, or the first page of the full list)
+def load_contacts(db_conn, contacts_list_view, search_term=""):
+    results = get_all_contacts_db(db_conn, search_term) if search_term else []
+    show_contacts(db_conn, contacts_list_view, search_term, results)
+
+def show_contacts(db_conn, contacts_list_view, search_term, results):
+    state = list_state(contacts_list_view)
+    state["search"] = search_term
+    state["results"] = results
+    state["more_before"] = False
+    if search_term:
+        state["rows"] = state["results"][:PAGE_SIZE]
+        state["more_after"] = len(state["results"]) > PAGE_SIZE
+    else:
+        state["rows"], state["more_after"] = fetch_page(db_conn, state)
+    render_window(db_conn, contacts_list_view)
+    # scroll_to sends the pending list changes along with the scroll
+    if contacts_list_view.page is not None:
+        contacts_list_view.scroll_to(offset=0, duration=0)
+
+# Live search. A keystroke waits SEARCH_DEBOUNCE seconds for typing to pause,
+# then the query runs on a worker thread with its own read connection, so the
+# UI never waits on SQLite. Each keystroke cancels the search before it and
+# interrupts its query if it is already running; a result that arrives after
+# a newer keystroke is dropped.
+SEARCH_DEBOUNCE = 0.25
+
+# One worker thread, owning the read connection (opened on first search)
+_search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="contact-search")
+_search_conn = None
+
+def start_search(db_conn, contacts_list_view, search_term):
+    state = list_state(contacts_list_view)
+    state["search_seq"] += 1
+    if state["search_task"] is not None:
+        state["search_task"].cancel()
+    if state["running_seq"] is not None and _search_conn is not None:
+        _search_conn.interrupt()
+
+    # Clearing the box shows the full list straight away; its first page is cheap
+    if not search_term.strip():
+        state["search_task"] = None
+        load_contacts(db_conn, contacts_list_view)
+        return
+    state["search_task"] = asyncio.create_task(
+        search_contacts(db_conn, contacts_list_view, search_term, state["search_seq"])
+    )
+
+async def search_contacts(db_conn, contacts_list_view, search_term, seq):
+    state = list_state(contacts_list_view)
+    await asyncio.sleep(SEARCH_DEBOUNCE)
+    try:
+        results = await asyncio.get_running_loop().run_in_executor(
+            _search_executor, run_search, db_conn, state, search_term, seq
         )
+    except sqlite3.Error as ex:
+        show_snack(contacts_list_view.page, f"Search failed: {ex}")
+        return
+    if results is None or seq != state["search_seq"]:
+        return
+    show_contacts(db_conn, contacts_list_view, search_term, results)
 
-        contacts_list_view.controls.append(card)
+# Runs on the worker thread. Returns None if the search was superseded.
+def run_search(db_conn, state, search_term, seq):
+    global _search_conn
+    if _search_conn is None:
+        _search_conn = open_read_connection(db_conn)
+    while seq == state["search_seq"]:
+        state["running_seq"] = seq
+        try:
+            return get_all_contacts_db(_search_conn, search_term)
+        except sqlite3.OperationalError as ex:
+            # An interrupt meant for the previous search can land on this one;
+            # if this search is still the latest, run it again
+            if "interrupted" not in str(ex):
+                raise
+        finally:
+            state["running_seq"] = None
+    return None
 
-    contacts_list_view.update()
+# Slide the window when the viewport nears either end of it
+def on_contacts_scroll(e, db_conn, contacts_list_view):
+    state = list_state(contacts_list_view)
+    rows = state["rows"]
+    if not rows or e.pixels is None or e.max_scroll_extent is None:
+        return
+    margin = PREFETCH_CARDS * CARD_EXTENT
+
+    if state["more_after"] and e.pixels >= e.max_scroll_extent - margin:
+        page, state["more_after"] = fetch_page(db_conn, state, after=rows[-1])
+        rows = rows + page
+        dropped = max(len(rows) - WINDOW_SIZE, 0)
+        state["rows"] = rows[dropped:]
+        state["more_before"] = state["more_before"] or dropped > 0
+        render_window(db_conn, contacts_list_view)
+        # Rows left the top of the list; move up by as much to stay in place
+        if dropped:
+            contacts_list_view.scroll_to(offset=e.pixels - dropped * CARD_EXTENT, duration=0)
+        else:
+            contacts_list_view.update()
+
+    elif state["more_before"] and e.pixels <= e.min_scroll_extent + margin:
+        page, state["more_before"] = fetch_page(db_conn, state, before=rows[0])
+        rows = page + rows
+        dropped = max(len(rows) - WINDOW_SIZE, 0)
+        state["rows"] = rows[:len(rows) - dropped]
+        state["more_after"] = state["more_after"] or dropped > 0
+        render_window(db_conn, contacts_list_view)
+        # Rows were added above the viewport; move down by as much
+        contacts_list_view.scroll_to(offset=e.pixels + len(page) * CARD_EXTENT, duration=0)
 
 # Confirmation before deleting
 def confirm_delete(db_conn, contact_id, contacts_list_view):
@@ -108,7 +359,7 @@ def confirm_delete(db_conn, contact_id, contacts_list_view):
     # If page is missing (unexpected), perform delete directly as a fallback
     if page is None:
         delete_contact_db(db_conn, contact_id)
-        load_contacts(db_conn, contacts_list_view)
+        remove_contact_card(db_conn, contacts_list_view, contact_id)
         return
 
     dialog = ft.AlertDialog(
@@ -120,10 +371,11 @@ def confirm_delete(db_conn, contact_id, contacts_list_view):
     )
 
     # ✅ define handlers AFTER dialog so they can reference it
-    def yes_delete(e):
+    # (async, so the list window is changed on the event loop, not a worker thread)
+    async def yes_delete(e):
         try:
             deleted = delete_contact_db(db_conn, contact_id)
-            load_contacts(db_conn, contacts_list_view)
+            remove_contact_card(db_conn, contacts_list_view, contact_id)
             dialog.open = False
             if deleted > 0:
                 page.snack_bar = ft.SnackBar(ft.Text("Contact deleted"), open=True)
@@ -152,3 +404,50 @@ def confirm_delete(db_conn, contact_id, contacts_list_view):
         pass
     dialog.open = True
     page.update()
+
+# Bulk import/export of a CSV or vCard file (see import_export). The work runs
+# on a worker thread; the progress bar is updated from there after each chunk,
+# so the UI stays responsive while a large file loads.
+async def import_contacts_file(db_conn, contacts_list_view, path, progress_bar):
+    page = contacts_list_view.page
+    set_progress(progress_bar, 0.0)
+    try:
+        stats = await asyncio.to_thread(
+            import_contacts, db_conn, path, lambda done: set_progress(progress_bar, done)
+        )
+    except (OSError, UnicodeDecodeError, csv.Error, sqlite3.Error) as ex:
+        stats = None
+        show_snack(page, f"Import failed: {ex}")
+    finally:
+        set_progress(progress_bar, None)
+    # Reload the list (or rerun the search) to show the new contacts; chunks
+    # committed before a failure stay imported
+    start_search(db_conn, contacts_list_view, list_state(contacts_list_view)["search"])
+    if stats is None:
+        return
+    message = f"Imported {stats['imported']} of {stats['read']} contacts"
+    skipped = [f"{stats[key]} {key}" for key in ("duplicates", "invalid") if stats[key]]
+    if skipped:
+        message += f" (skipped {', '.join(skipped)})"
+    show_snack(page, message)
+
+async def export_contacts_file(db_conn, contacts_list_view, path, progress_bar):
+    page = contacts_list_view.page
+    set_progress(progress_bar, 0.0)
+    try:
+        written = await asyncio.to_thread(
+            export_contacts, db_conn, path, lambda done: set_progress(progress_bar, done)
+        )
+    except (OSError, sqlite3.Error) as ex:
+        show_snack(page, f"Export failed: {ex}")
+        return
+    finally:
+        set_progress(progress_bar, None)
+    show_snack(page, f"Exported {written} contacts")
+
+# Show the fraction done, or hide the bar when `done` is None
+def set_progress(progress_bar, done):
+    progress_bar.visible = done is not None
+    progress_bar.value = done
+    if progress_bar.page is not None:
+        progress_bar.update()
@@ -1,8 +1,25 @@
+import re
 import sqlite3
+from pathlib import Path
 
-def init_db():
-    conn = sqlite3.connect("contacts.db", check_same_thread=False)
+# Most rows a search returns; the best matches come first
+SEARCH_LIMIT = 200
+# Rows per page of the contact list
+PAGE_SIZE = 20
+# Searches with at most this many matches are ranked with bm25. Scoring costs
+# time per match, so a broad prefix like "0" or "gmail" (most of the table)
+# is answered from the name index instead; see get_all_contacts_db.
+RANK_LIMIT = 2000
+
+# Set by init_db: whether the FTS5 index could be created
+_fts_enabled = False
+
+def init_db(path="contacts.db"):
+    global _fts_enabled
+    conn = sqlite3.connect(path, check_same_thread=False)
     cur = conn.cursor()
+    # WAL lets searches read on their own connection while this one writes
+    cur.execute("PRAGMA journal_mode=WAL")
     cur.execute("""
         CREATE TABLE IF NOT EXISTS contacts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -11,22 +28,268 @@ def init_db():
             email TEXT
         )
     """)
+    # Sort order of the contact list; lets keyset pagination seek instead of scan
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_contacts_name ON contacts (name COLLATE NOCASE, id)")
     conn.commit()
+    _fts_enabled = init_search_index(conn)
     return conn
 
+# A read-only connection to the same database file, for queries that run
+# off the UI thread (see app_logic.run_search)
+def open_read_connection(conn):
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    return sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+
+# A second writer on the same file, for bulk imports on a worker thread.
+# SQLite allows one writer at a time: a contact added from the form waits for
+# the import's current chunk to commit (sqlite3's busy timeout), and the
+# import waits up to `timeout` seconds for the form. synchronous=NORMAL is
+# safe in WAL mode: a power cut can lose the last commits, never corrupt.
+def open_write_connection(conn, timeout=30.0):
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    write_conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    write_conn.execute("PRAGMA synchronous=NORMAL")
+    return write_conn
+
+# Indexes each new row for search; insert_contacts_bulk_db drops and recreates it
+INDEX_NEW_CONTACT = """
+    CREATE TRIGGER IF NOT EXISTS contacts_ai AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, name, phone, email)
+        VALUES (new.id, new.name, new.phone, new.email);
+    END
+"""
+
+# Full-text index over name, phone and email. It is an external-content table:
+# it stores only the index, and the triggers keep it in step with contacts.
+# prefix='1 2 3' adds prefix indexes so short, half-typed terms stay fast.
+def init_search_index(conn):
+    cur = conn.cursor()
+    existed = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='contacts_fts'"
+    ).fetchone() is not None
+    try:
+        cur.executescript(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+                name, phone, email,
+                content='contacts', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='1 2 3'
+            );
+            {INDEX_NEW_CONTACT};
+            CREATE TRIGGER IF NOT EXISTS contacts_ad AFTER DELETE ON contacts BEGIN
+                INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email)
+                VALUES ('delete', old.id, old.name, old.phone, old.email);
+            END;
+            CREATE TRIGGER IF NOT EXISTS contacts_au AFTER UPDATE ON contacts BEGIN
+                INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email)
+                VALUES ('delete', old.id, old.name, old.phone, old.email);
+                INSERT INTO contacts_fts(rowid, name, phone, email)
+                VALUES (new.id, new.name, new.phone, new.email);
+            END;
+        """)
+        # Index rows that were added before the index existed
+        if not existed:
+            cur.execute("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')")
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: searches fall back to LIKE
+        print(f"Full-text search unavailable: {e}")
+        return False
+
+# Turn what the user typed into an FTS5 query: every word must match the
+# start of a word in name, phone or email ("jo gm" finds "John", "john@gmail.com").
+# Words are quoted so characters like - or " are never read as query syntax.
+def build_match_query(search_term):
+    words = re.findall(r"\w+", search_term.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
 def insert_contact_db(conn, name, phone, email):
     cur = conn.cursor()
     cur.execute("INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)", (name, phone, email))
     conn.commit()
+    return cur.lastrowid
 
-def get_all_contacts_db(conn, search_term=""):
+# Dedupe keys for a bulk import (see import_export.dedupe_key), seeded with
+# `keys` for the contacts already in the book. Both tables are TEMP: private
+# to this connection, dropped when it closes, and kept by SQLite in a
+# temporary file with a bounded page cache, so they do not grow the process
+# however many contacts there are. import_rows stages one chunk at a time;
+# its UNIQUE key keeps the first of several equal rows in the chunk.
+def create_import_keys_db(conn, keys):
+    conn.execute("""
+        CREATE TEMP TABLE import_keys (
+            name TEXT,
+            phone TEXT,
+            email TEXT,
+            PRIMARY KEY (name, phone, email)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TEMP TABLE import_rows (
+            name TEXT,
+            phone TEXT,
+            email TEXT,
+            key_name TEXT,
+            key_phone TEXT,
+            key_email TEXT,
+            UNIQUE (key_name, key_phone, key_email)
+        )
+    """)
+    # Inserting a million keys in sorted order is several times faster than
+    # in table order, so stage them unsorted and let SQLite sort them
+    conn.execute("CREATE TEMP TABLE import_seed (name TEXT, phone TEXT, email TEXT)")
+    conn.executemany("INSERT INTO import_seed VALUES (?, ?, ?)", keys)
+    conn.execute("INSERT OR IGNORE INTO import_keys SELECT * FROM import_seed ORDER BY 1, 2, 3")
+    conn.execute("DROP TABLE import_seed")
+    conn.commit()
+
+# Insert many (name, phone, email) rows in one transaction: one commit and
+# one fsync for the lot instead of one per row. Maintaining the search index
+# row by row through the trigger is several times slower than indexing the
+# new rows with a single INSERT ... SELECT, so the trigger is dropped for the
+# insert and recreated before commit. DDL is transactional in SQLite: other
+# connections never see the trigger missing, and an error rolls back all of it.
+# With `keys` (one per row, after create_import_keys_db), rows whose key is
+# already in import_keys, or repeats one earlier in `contacts`, are skipped;
+# the keys of the rows inserted are added in the same transaction, so they
+# roll back with them.
+def insert_contacts_bulk_db(conn, contacts, keys=None):
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM contacts").fetchone()[0]
+        if _fts_enabled:
+            cur.execute("DROP TRIGGER IF EXISTS contacts_ai")
+        if keys is None:
+            cur.executemany("INSERT INTO contacts (name, phone, email) VALUES (?, ?, ?)", contacts)
+            inserted = cur.rowcount
+        else:
+            cur.executemany(
+                "INSERT OR IGNORE INTO import_rows VALUES (?, ?, ?, ?, ?, ?)",
+                (contact + key for contact, key in zip(contacts, keys)),
+            )
+            cur.execute("""
+                INSERT INTO contacts (name, phone, email)
+                SELECT r.name, r.phone, r.email FROM import_rows r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM import_keys k
+                    WHERE k.name = r.key_name AND k.phone = r.key_phone AND k.email = r.key_email
+                )
+                ORDER BY r.rowid
+            """)
+            inserted = cur.rowcount
+            cur.execute("""
+                INSERT OR IGNORE INTO import_keys
+                SELECT key_name, key_phone, key_email FROM import_rows
+            """)
+            cur.execute("DELETE FROM import_rows")
+        if _fts_enabled:
+            # AUTOINCREMENT ids only grow, so the new rows are exactly id > last_id
+            cur.execute("""
+                INSERT INTO contacts_fts(rowid, name, phone, email)
+                SELECT id, name, phone, email FROM contacts WHERE id > ?
+            """, (last_id,))
+            cur.execute(INDEX_NEW_CONTACT)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return inserted
+
+def get_all_contacts_db(conn, search_term="", limit=SEARCH_LIMIT):
     cur = conn.cursor()
-    if search_term:
-        cur.execute("SELECT * FROM contacts WHERE name LIKE ?", ('%' + search_term + '%',))
+    if search_term and _fts_enabled:
+        match = build_match_query(search_term)
+        if not match:
+            return []
+        # Fetch up to RANK_LIMIT + 1 matches with their bm25 score (a name
+        # match counts more than phone/email). Without ORDER BY, FTS5 stops
+        # after the LIMIT, so this costs at most RANK_LIMIT + 1 scores.
+        hits = cur.execute("""
+            SELECT rowid, bm25(contacts_fts, 10.0, 2.0, 2.0)
+            FROM contacts_fts
+            WHERE contacts_fts MATCH ?
+            LIMIT ?
+        """, (match, RANK_LIMIT + 1)).fetchall()
+        if len(hits) <= RANK_LIMIT:
+            # Every match is here: rank all of them, best first
+            hits.sort(key=lambda hit: hit[1])
+            ids = [rowid for rowid, _ in hits[:limit]]
+        else:
+            # Too broad to rank: names that start with the term first, in list
+            # order (a range on idx_contacts_name), then other matches, oldest first
+            prefix = " ".join(search_term.split())
+            ids = [row[0] for row in cur.execute("""
+                SELECT id FROM contacts
+                WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE
+                ORDER BY name COLLATE NOCASE, id
+                LIMIT ?
+            """, (prefix, prefix + "\U0010ffff", limit))]
+            named = set(ids)
+            ids += [rowid for rowid, _ in hits if rowid not in named][:limit - len(ids)]
+        return _contacts_by_id(cur, ids)
+    elif search_term:
+        pattern = '%' + search_term + '%'
+        cur.execute(
+            "SELECT * FROM contacts WHERE name LIKE ? OR phone LIKE ? OR email LIKE ? LIMIT ?",
+            (pattern, pattern, pattern, limit),
+        )
     else:
         cur.execute("SELECT * FROM contacts")
     return cur.fetchall()
 
+# The contacts with the given ids, in the order of `ids`
+def _contacts_by_id(cur, ids):
+    if not ids:
+        return []
+    placeholders = ",".join("?" * len(ids))
+    rows = {row[0]: row for row in cur.execute(f"SELECT * FROM contacts WHERE id IN ({placeholders})", ids)}
+    return [rows[contact_id] for contact_id in ids if contact_id in rows]
+
+# One page of contacts in list order (name, then id), using keyset pagination:
+# the page starts right after the `after` row or ends right before the `before`
+# row, given as (name, id). Unlike OFFSET, the cost does not grow with how far
+# down the list the page is.
+def get_contacts_page_db(conn, after=None, before=None, limit=PAGE_SIZE):
+    cur = conn.cursor()
+    if after is not None:
+        cur.execute("""
+            SELECT * FROM contacts
+            WHERE name >= ? COLLATE NOCASE AND (name > ? COLLATE NOCASE OR id > ?)
+            ORDER BY name COLLATE NOCASE, id
+            LIMIT ?
+        """, (after[0], after[0], after[1], limit))
+        return cur.fetchall()
+    if before is not None:
+        cur.execute("""
+            SELECT * FROM contacts
+            WHERE name <= ? COLLATE NOCASE AND (name < ? COLLATE NOCASE OR id < ?)
+            ORDER BY name COLLATE NOCASE DESC, id DESC
+            LIMIT ?
+        """, (before[0], before[0], before[1], limit))
+        return cur.fetchall()[::-1]
+    cur.execute("SELECT * FROM contacts ORDER BY name COLLATE NOCASE, id LIMIT ?", (limit,))
+    return cur.fetchall()
+
+# Every contact, fetched batch_size rows at a time so a large table is never
+# held in memory at once. List order costs an index lookup per row; pass
+# ordered=False when the order does not matter.
+def iter_contacts_db(conn, batch_size=1000, ordered=True):
+    cur = conn.cursor()
+    if ordered:
+        cur.execute("SELECT * FROM contacts ORDER BY name COLLATE NOCASE, id")
+    else:
+        cur.execute("SELECT * FROM contacts")
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+def count_contacts_db(conn):
+    return conn.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
 def delete_contact_db(conn, contact_id):
     cur = conn.cursor()
     cur.execute("DELETE FROM contacts WHERE id=?", (contact_id,))
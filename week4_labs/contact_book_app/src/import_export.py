@@ -0,0 +1,234 @@
+import csv
+import os
+import re
+from itertools import islice
+from pathlib import Path
+
+from database import (
+    count_contacts_db,
+    create_import_keys_db,
+    insert_contacts_bulk_db,
+    iter_contacts_db,
+    open_read_connection,
+    open_write_connection,
+)
+
+# Bulk import and export of contacts as CSV or vCard. Both stream: files are
+# parsed one row at a time by generators and rows are inserted in chunks of
+# IMPORT_CHUNK, one transaction each. Duplicates are found in SQLite (see
+# create_import_keys_db), not in a Python set, so memory stays flat however
+# large the file or the book is. Both are blocking and meant to run on a worker thread; `progress`,
+# if given, is called with the fraction done (0.0 to 1.0) after each chunk.
+
+# Rows per transaction. Bigger chunks mean fewer commits; this many keep
+# progress moving and hold the write lock for well under a second at a time.
+IMPORT_CHUNK = 50_000
+# Rows per write when exporting
+EXPORT_CHUNK = 5_000
+
+VCARD_SUFFIXES = (".vcf", ".vcard")
+
+# Accepted CSV header names for each field (compared lower-cased)
+CSV_HEADERS = {
+    "name": ("name", "full name", "fn", "display name", "contact name"),
+    "phone": ("phone", "phone number", "mobile", "mobile number", "tel", "telephone"),
+    "email": ("email", "e-mail", "email address", "e-mail address", "mail"),
+}
+
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_NON_DIGITS = re.compile(r"\D")
+
+def is_vcard(path):
+    return Path(path).suffix.lower() in VCARD_SUFFIXES
+
+# Same rules as the form: a name is required and phones keep their digits
+# only. Returns None for a row that cannot be imported.
+def clean_contact(name, phone, email):
+    name = " ".join(name.split())
+    if not phone.isdecimal():
+        phone = _NON_DIGITS.sub("", phone)
+    email = email.strip()
+    if not name or (email and not _EMAIL.fullmatch(email)):
+        return None
+    return name, phone, email
+
+# Contacts are the same when their names match ignoring case and spacing,
+# and their phone digits and emails (ignoring case) match
+def dedupe_key(name, phone, email):
+    phone = phone or ""
+    if not phone.isdecimal():
+        phone = _NON_DIGITS.sub("", phone)
+    return " ".join(name.split()).casefold(), phone, (email or "").strip().lower()
+
+# CSV rows as (name, phone, email). A header row picks the columns by name;
+# without one, the columns are taken as name, phone, email in that order.
+def read_csv(f):
+    reader = csv.reader(f)
+    first = next(reader, None)
+    if first is None:
+        return
+    header = [cell.strip().lower() for cell in first]
+    columns = [
+        next((i for i, cell in enumerate(header) if cell in names), None)
+        for names in CSV_HEADERS.values()
+    ]
+    if all(i is None for i in columns):
+        columns = [0, 1, 2]
+        yield _pick(first, columns)
+    for row in reader:
+        if row:
+            yield _pick(row, columns)
+
+def _pick(row, columns):
+    return tuple(row[i] if i is not None and i < len(row) else "" for i in columns)
+
+# vCard (2.1, 3.0 and 4.0) cards as (name, phone, email), taking the first
+# TEL and EMAIL of each card. FN is the name; N is used if a card has no FN.
+def read_vcard(f):
+    card = None
+    for line in _unfold(f):
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        # "item1.TEL;TYPE=CELL" -> "TEL"
+        prop = key.split(";", 1)[0].rsplit(".", 1)[-1].strip().upper()
+        if prop == "BEGIN" and value.strip().upper() == "VCARD":
+            card = {}
+        elif card is None:
+            continue
+        elif prop == "END":
+            name = card.get("FN") or _name_from_n(card.get("N", ""))
+            yield _unescape(name), card.get("TEL", ""), _unescape(card.get("EMAIL", ""))
+            card = None
+        elif prop in ("FN", "N", "TEL", "EMAIL") and prop not in card:
+            card[prop] = value
+
+# Long vCard lines are folded: a line starting with a space or tab continues
+# the one before it
+def _unfold(f):
+    line = None
+    for raw in f:
+        raw = raw.rstrip("\r\n")
+        if line is not None and raw[:1] in (" ", "\t"):
+            line += raw[1:]
+            continue
+        if line is not None:
+            yield line
+        line = raw
+    if line is not None:
+        yield line
+
+# N is "Family;Given;Middle;Prefix;Suffix"
+def _name_from_n(value):
+    parts = value.split(";") + [""] * 5
+    family, given, middle, prefix, suffix = parts[:5]
+    return " ".join(part for part in (prefix, given, middle, family, suffix) if part)
+
+def _unescape(value):
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+def _escape(value):
+    return (value.replace("\\", "\\\\").replace("\n", "\\n")
+            .replace(",", "\\,").replace(";", "\\;"))
+
+# RFC 6350 folds lines longer than 75 characters
+def _fold(line):
+    if len(line) <= 75:
+        return line
+    return "\r\n ".join([line[:75]] + [line[i:i + 74] for i in range(75, len(line), 74)])
+
+def format_vcard(contact):
+    _, name, phone, email = contact
+    given, _, family = name.rpartition(" ") if " " in name else (name, "", "")
+    lines = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        _fold("FN:" + _escape(name)),
+        _fold(f"N:{_escape(family)};{_escape(given)};;;"),
+    ]
+    if phone:
+        lines.append(_fold("TEL;TYPE=CELL:" + _escape(phone)))
+    if email:
+        lines.append(_fold("EMAIL;TYPE=INTERNET:" + _escape(email)))
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
+
+# Read, validate, dedupe and insert every contact in the file at `path`.
+# A contact already in the book or seen earlier in the file (see dedupe_key)
+# is skipped. Chunks that committed stay imported if a later one fails.
+# Returns counts of what happened to the rows.
+def import_contacts(db_conn, path, progress=None, chunk_size=IMPORT_CHUNK):
+    stats = {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0}
+    write_conn = open_write_connection(db_conn)
+    try:
+        create_import_keys_db(write_conn, (
+            dedupe_key(name, phone, email)
+            for _, name, phone, email in iter_contacts_db(write_conn, ordered=False)
+        ))
+        size = os.path.getsize(path) or 1
+        vcard = is_vcard(path)
+        # utf-8-sig drops the byte order mark spreadsheet programs write
+        with open(path, "r", encoding="utf-8-sig", newline=None if vcard else "") as f:
+            rows = read_vcard(f) if vcard else read_csv(f)
+            chunk, keys = [], []
+            for row in rows:
+                stats["read"] += 1
+                contact = clean_contact(*row)
+                if contact is None:
+                    stats["invalid"] += 1
+                    continue
+                chunk.append(contact)
+                keys.append(dedupe_key(*contact))
+                if len(chunk) >= chunk_size:
+                    _insert_chunk(write_conn, chunk, keys, stats)
+                    chunk, keys = [], []
+                    if progress:
+                        # Position of the underlying binary file: read ahead
+                        # by one buffer at most, close enough for a progress bar
+                        progress(min(f.buffer.tell() / size, 1.0))
+            if chunk:
+                _insert_chunk(write_conn, chunk, keys, stats)
+        if progress:
+            progress(1.0)
+        return stats
+    finally:
+        write_conn.close()
+
+def _insert_chunk(write_conn, chunk, keys, stats):
+    imported = insert_contacts_bulk_db(write_conn, chunk, keys)
+    stats["imported"] += imported
+    stats["duplicates"] += len(chunk) - imported
+
+# Write every contact, in list order, to `path` as CSV (with a header row)
+# or vCard, chosen by the file extension. Rows are read on a separate
+# read-only connection, EXPORT_CHUNK at a time. Returns the number written.
+def export_contacts(db_conn, path, progress=None):
+    read_conn = open_read_connection(db_conn)
+    try:
+        total = count_contacts_db(read_conn) or 1
+        written = 0
+        vcard = is_vcard(path)
+        # Write to a temporary file and move it into place, so a failed
+        # export never leaves a truncated file behind
+        tmp_path = Path(path).with_name(Path(path).name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            writer = None
+            if not vcard:
+                writer = csv.writer(f)
+                writer.writerow(["name", "phone", "email"])
+            rows = iter_contacts_db(read_conn, EXPORT_CHUNK)
+            while True:
+                chunk = list(islice(rows, EXPORT_CHUNK))
+                if not chunk:
+                    break
+                if vcard:
+                    f.write("".join(format_vcard(row) for row in chunk))
+                else:
+                    writer.writerows((name, phone or "", email or "") for _, name, phone, email in chunk)
+                written += len(chunk)
+                if progress:
+                    progress(min(written / total, 1.0))
+        os.replace(tmp_path, path)
+        return written
+    finally:
+        read_conn.close()
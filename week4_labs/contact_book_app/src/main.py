@@ -1,6 +1,15 @@
 import flet as ft
 from database import init_db
-from app_logic import add_contact, load_contacts
+from app_logic import (
+    CARD_EXTENT,
+    add_contact,
+    export_contacts_file,
+    import_contacts_file,
+    load_contacts,
+    on_contacts_scroll,
+    show_snack,
+    start_search,
+)
 
 def main(page: ft.Page):
     page.title = "Contact Book"
@@ -15,16 +24,78 @@ def main(page: ft.Page):
     phone_field = ft.Ref[ft.TextField]()
     email_field = ft.Ref[ft.TextField]()
 
-    contacts_list_view = ft.ListView(expand=True, spacing=10, padding=10)
+    # Cards have a fixed height so only the visible ones are laid out, and
+    # scrolling near the end pages in more contacts (see app_logic).
+    # The handler is async so scroll events run one at a time on the event
+    # loop, never on worker threads alongside each other or a search.
+    async def on_scroll(e):
+        on_contacts_scroll(e, db_conn, contacts_list_view)
+
+    contacts_list_view = ft.ListView(
+        expand=True,
+        padding=10,
+        item_extent=CARD_EXTENT,
+        on_scroll_interval=50,
+        on_scroll=on_scroll,
+    )
+
+    # Search bar: debounced, and queried off the UI thread (see app_logic)
+    async def on_search_change(e):
+        start_search(db_conn, contacts_list_view, search_input.value)
 
-    # Search bar
     search_input = ft.TextField(
         hint_text="Search Contact",
         prefix_icon=ft.Icons.SEARCH,
         width=250,
         border_radius=20,
         border_color="black",
-        on_change=lambda e: load_contacts(db_conn, contacts_list_view, search_input.value),
+        on_change=on_search_change,
+    )
+
+    # Bulk import/export of CSV or vCard files, on a worker thread with progress
+    transfer_progress = ft.ProgressBar(width=400, visible=False)
+
+    async def on_import_picked(e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        if e.files[0].path is None:
+            # Web builds get file names but no paths
+            show_snack(page, "Import is only available in the desktop app")
+            return
+        import_button.disabled = True
+        import_button.update()
+        try:
+            await import_contacts_file(db_conn, contacts_list_view, e.files[0].path, transfer_progress)
+        finally:
+            import_button.disabled = False
+            import_button.update()
+
+    async def on_export_picked(e: ft.FilePickerResultEvent):
+        if e.path:
+            await export_contacts_file(db_conn, contacts_list_view, e.path, transfer_progress)
+
+    import_picker = ft.FilePicker(on_result=on_import_picked)
+    export_picker = ft.FilePicker(on_result=on_export_picked)
+    page.overlay.extend([import_picker, export_picker])
+
+    import_button = ft.OutlinedButton(
+        "Import",
+        icon=ft.Icons.UPLOAD_FILE,
+        on_click=lambda e: import_picker.pick_files(
+            dialog_title="Import contacts",
+            file_type=ft.FilePickerFileType.CUSTOM,
+            allowed_extensions=["csv", "vcf", "vcard"],
+        ),
+    )
+    export_button = ft.OutlinedButton(
+        "Export",
+        icon=ft.Icons.DOWNLOAD,
+        on_click=lambda e: export_picker.save_file(
+            dialog_title="Export contacts (.csv or .vcf)",
+            file_name="contacts.csv",
+            file_type=ft.FilePickerFileType.CUSTOM,
+            allowed_extensions=["csv", "vcf"],
+        ),
     )
 
     # Dark mode switch
@@ -67,23 +138,28 @@ def main(page: ft.Page):
             phone_field.current.value = digits_only
             phone_field.current.update()
 
+    # Async so it runs on the event loop: adding a contact updates the list
+    # window and may restart the search task (see app_logic.insert_contact_card)
+    async def on_add_click(e):
+        add_contact(
+            name_field.current.value,
+            phone_field.current.value,
+            email_field.current.value,
+            db_conn,
+            contacts_list_view,
+            name_field,
+            phone_field,
+            email_field,
+            page,
+        )
+
     # Email row + Add button
     add_contact_row = ft.Row(
         [
             ft.Container(
                 content=ft.ElevatedButton(
                     "Add Contact",
-                    on_click=lambda e: add_contact(
-                        name_field.current.value,
-                        phone_field.current.value,
-                        email_field.current.value,
-                        db_conn,
-                        contacts_list_view,
-                        name_field,
-                        phone_field,
-                        email_field,
-                        page,
-                    ),
+                    on_click=on_add_click,
                     style=ft.ButtonStyle(
                         padding=ft.padding.symmetric(horizontal=20, vertical=10),
                         shape=ft.RoundedRectangleBorder(radius=20),
@@ -101,11 +177,14 @@ def main(page: ft.Page):
         # Top bar
         ft.Row(
             [
+                import_button,
+                export_button,
                 search_input,
                 ft.Container(dark_mode_switch, padding=ft.padding.only(left=12)),
             ],
             alignment=ft.MainAxisAlignment.END,
         ),
+        transfer_progress,
 
         # Centered form
         ft.Column(